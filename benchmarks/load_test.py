@@ -0,0 +1,231 @@
+"""
+End-to-end crawl load test against the local Internshala stand-in server.
+
+Starts benchmarks.standin_server in a subprocess (or uses `--server-url`),
+points the scraper's config at it and times the full pipeline:
+    1. InternshalaScraper.build_urls()   search result pages -> job URLs
+    2. scrape() / scrape_async()         job detail pages -> JobDetails
+    3. with --persist, every job is streamed into MongoBufferedSink (upserts)
+       as the DAG's scrape_persist does, instead of being collected in memory
+
+Reports jobs/minute end to end, per-phase seconds, CPU time and peak RSS of
+the scraper process, the scraper's fetch stats and the server's counters.
+
+Rate limits come from the config, raise them with `--rps` (the stand-in has
+no politeness constraints). Mongo credentials come from APP_USER / APP_PASSWORD.
+INFO logs are off unless `--verbose`, warnings (retries, circuit breaker) still show.
+
+Usage:
+    python -m benchmarks.load_test [--listings 2000] [--latency 0.05] [--mode async] [--rps 50]
+    python -m benchmarks.load_test --error-rate 0.02 --burst-every 20 --persist --mongo-host localhost
+"""
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import logging
+import asyncio
+import hashlib
+import argparse
+import resource
+import subprocess
+from dataclasses import asdict
+from urllib.request import urlopen
+from src.constants import Constants
+from src.core.config import ScraperConfig
+from src.core.utils import load_json
+from src.scrapers import InternshalaScraper
+
+# stand-in server options passed through as --<name>
+SERVER_OPTIONS = ("listings", "per_page", "latency", "error_rate", "missing_rate", "burst_every", "burst_length", "seed")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args) -> tuple[subprocess.Popen, str]:
+    """ Run the stand-in in its own process, so it doesn't share the scraper's GIL."""
+    port = _free_port()
+    command = [sys.executable, "-m", "benchmarks.standin_server", "--port", str(port)]
+    for name in SERVER_OPTIONS:
+        command += ["--" + name.replace("_", "-"), str(getattr(args, name))]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process, base_url
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("stand-in server did not start")
+
+
+def build_config(args, base_url: str) -> ScraperConfig:
+    cfg = ScraperConfig.from_dict(load_json(args.config))
+    cfg.base_urls = {**cfg.base_urls, "internshala": base_url}
+    cfg.max_page = args.max_page or -(-args.listings // args.per_page) + 1
+    if args.rps:
+        cfg.rate_limit_rps = cfg.rate_limit_max_rps = args.rps
+        cfg.rate_limit_burst = max(cfg.rate_limit_burst, int(args.rps))
+    if args.max_concurrency:
+        cfg.max_concurrency = args.max_concurrency
+        cfg.per_host_concurrency = args.max_concurrency
+        cfg.pool_size = max(cfg.pool_size, args.max_concurrency)
+    if args.backend:
+        cfg.parser_backend = args.backend
+    return cfg
+
+
+def _mongo_sink(args):
+    from src.db_services import MongoClient, MongoBufferedSink
+    db = MongoClient(
+        db_name="jobs",
+        collection_name=args.collection,
+        user_name=os.environ["APP_USER"],
+        password=os.environ["APP_PASSWORD"],
+        service=args.mongo_host,
+        port=str(args.mongo_port),
+    )
+    return db, MongoBufferedSink(db, batch_size=args.batch_size, upsert=True)
+
+
+def _persist(sink, job):
+    doc = asdict(job)
+    doc["_id"] = hashlib.md5(doc["url"].encode()).hexdigest()  # same ids as the DAG's make_id
+    sink.write(doc)
+
+
+async def _scrape_async(scraper: InternshalaScraper, urls: list[str], sink, on_error) -> int:
+    if sink is None:
+        return len(await scraper.scrape_async(urls, on_error=on_error))
+    count = 0
+    async for job in scraper.aiter_scrape(urls, on_error=on_error):
+        _persist(sink, job)
+        count += 1
+    return count
+
+
+def run(args, base_url: str) -> dict:
+    cfg = build_config(args, base_url)
+    failures = []
+    on_error = lambda url, error: failures.append(url)
+    phases = {}
+
+    db, sink = _mongo_sink(args) if args.persist else (None, None)
+    start = time.monotonic()
+    with InternshalaScraper(cfg) as scraper:
+        if args.mode == "async":
+            urls = asyncio.run(scraper.build_urls_async())
+        else:
+            urls = scraper.build_urls()
+        urls = urls[:args.limit] if args.limit > 0 else urls
+        phases["build_urls"] = time.monotonic() - start
+
+        if args.mode == "async":
+            jobs = asyncio.run(_scrape_async(scraper, urls, sink, on_error))
+        elif sink is not None:
+            jobs = 0
+            for job in scraper.iter_scrape(urls, on_error=on_error):
+                _persist(sink, job)
+                jobs += 1
+        else:
+            jobs = len(scraper.scrape(urls, on_error=on_error))
+        phases["scrape"] = time.monotonic() - start - phases["build_urls"]
+
+        if sink is not None:
+            persist_start = time.monotonic()
+            report = sink.close()
+            db.close()
+            phases["persist_close"] = time.monotonic() - persist_start
+        fetch = scraper.fetch_stats()
+    elapsed = time.monotonic() - start
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = usage.ru_utime + usage.ru_stime
+    result = {
+        "mode": args.mode,
+        "backend": cfg.parser_backend,
+        "job_urls": len(urls),
+        "jobs": jobs,
+        "failed": len(failures),
+        "seconds": round(elapsed, 2),
+        "jobs_per_min": round(jobs / elapsed * 60, 1) if elapsed else 0.0,
+        "phases_s": {name: round(value, 2) for name, value in phases.items()},
+        "cpu_s": round(cpu, 2),
+        "cpu_util": round(cpu / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),  # KiB on Linux
+        "fetch": fetch,
+    }
+    if sink is not None:
+        result["persist"] = report.summary()
+    return result
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--server-url", help="use a running stand-in instead of starting one")
+    arg_parser.add_argument("--config", default=Constants.config_path, help="scraper config, base URL is overridden")
+    arg_parser.add_argument("--mode", choices=("sync", "async"), default="async")
+    arg_parser.add_argument("--backend", help="parser backend, defaults to the config's")
+    arg_parser.add_argument("--rps", type=float, default=50.0, help="rate limit, 0 keeps the config's")
+    arg_parser.add_argument("--max-concurrency", type=int, default=0, help="in-flight requests, 0 keeps the config's")
+    arg_parser.add_argument("--max-page", type=int, default=0, help="0 pages through every listing")
+    arg_parser.add_argument("--limit", type=int, default=0, help="scrape at most this many job URLs")
+    arg_parser.add_argument("--listings", type=int, default=2000)
+    arg_parser.add_argument("--per-page", type=int, default=40)
+    arg_parser.add_argument("--latency", type=float, default=0.05)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--missing-rate", type=float, default=0.0)
+    arg_parser.add_argument("--burst-every", type=float, default=0.0)
+    arg_parser.add_argument("--burst-length", type=float, default=2.0)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--persist", action="store_true", help="stream jobs into Mongo")
+    arg_parser.add_argument("--mongo-host", default="localhost")
+    arg_parser.add_argument("--mongo-port", type=int, default=27017)
+    arg_parser.add_argument("--collection", default="load_test", help="kept apart from job_details")
+    arg_parser.add_argument("--batch-size", type=int, default=100)
+    arg_parser.add_argument("--json", action="store_true", help="print the report as JSON only")
+    arg_parser.add_argument("--verbose", action="store_true", help="keep the scraper's INFO logs")
+    args = arg_parser.parse_args()
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    process = None
+    base_url = args.server_url
+    if base_url is None:
+        process, base_url = start_server(args)
+        # a killed load test (e.g. by `timeout`) still stops its server
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    try:
+        result = run(args, base_url.rstrip("/"))
+        with urlopen(f"{base_url}/__stats", timeout=5) as response:
+            result["server"] = json.load(response)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        print(json.dumps(result))
+        return 0
+    print(f"{result['jobs']} jobs from {result['job_urls']} urls ({result['failed']} failed) in {result['seconds']}s "
+          f"-> {result['jobs_per_min']} jobs/min [{result['mode']}, {result['backend']}]")
+    print(f"phases: {result['phases_s']}")
+    print(f"cpu: {result['cpu_s']}s ({result['cpu_util']:.0%} of one core), peak rss: {result['peak_rss_mb']} MB")
+    print(f"fetch: {result['fetch']}")
+    if "persist" in result:
+        print(f"persist: {result['persist']}")
+    server = {k: v for k, v in result["server"].items() if k != "options"}
+    print(f"server: {server}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Offline parse throughput benchmark with a regression gate (no network).
+
+Every installed backend runs the scraper's own page handlers over the fixture
+corpus, fed from memory by a stand-in session:
+    - detail:  _scrape_job_details on fixtures/internshala/detail_*.html
+               (fetch, fingerprint, detail-container parse and field extraction)
+    - listing: _get_jobDetails_url on fixtures/internshala/listing_*.html
+
+Per case it reports pages/sec, p50/p99 latency per page and the tracemalloc
+peak of one pass over the corpus, and compares them with the stored baseline
+(benchmarks/baselines/parser_bench.json). A case slower or hungrier than its
+baseline by more than `--tolerance` (p99 gets twice the tolerance, it is the
+noisiest) is a regression and the exit code is 1.
+
+Log output is silenced while timing, so the numbers are parsing cost only.
+
+Usage:
+    python -m benchmarks.parser_bench [--repeat 10] [--rounds 5] [--tolerance 0.5]
+    python -m benchmarks.parser_bench --update-baseline   # after an intended change
+"""
+import os
+import gc
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import tracemalloc
+from datetime import datetime, timezone
+from src.core.exception import CustomException
+from src.scrapers.internshala._helpers.bf4_client import _scrape_job_details, _get_jobDetails_url
+from src.scrapers.internshala._helpers.html_backends import BACKENDS, get_backend
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "internshala")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "parser_bench.json")
+BASE_URL = "https://internshala.com"
+CONTAINER_ID = "details_container"
+
+# metric -> True when higher is better
+METRICS = {"pages_per_sec": True, "p50_ms": False, "p99_ms": False, "peak_kb": False}
+
+
+class _FixtureResponse:
+    headers = {}
+    status_code = 200
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class FixtureSession:
+    """ Stands in for the pooled requests.Session, serving fixture bytes by URL."""
+    def __init__(self, pages: dict[str, bytes]):
+        self.pages = pages
+
+    def get(self, url, headers=None, timeout=None):
+        return _FixtureResponse(self.pages[url])
+
+
+class _NoLimit:
+    """ Rate limiter that never waits."""
+    def acquire(self):
+        pass
+
+    def feedback(self, *args):
+        pass
+
+
+def _load(pattern: str) -> dict[str, bytes]:
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, pattern))):
+        with open(path, "rb") as f:
+            pages[f"{BASE_URL}/fixture/{os.path.basename(path)}"] = f.read()
+    return pages
+
+
+def _handlers(backend, pages: dict[str, bytes]) -> dict:
+    """ kind -> (urls, handler(url)) running the scraper's code path offline."""
+    session, limiter = FixtureSession(pages), _NoLimit()
+    details = [url for url in pages if "/detail_" in url]
+    listings = [url for url in pages if "/listing_" in url]
+    return {
+        "detail": (details, lambda url: _scrape_job_details(
+            {}, url, limiter=limiter, session=session, parser=backend, container_id=CONTAINER_ID)),
+        "listing": (listings, lambda url: _get_jobDetails_url(
+            {}, url, BASE_URL, limiter=limiter, session=session, parser=backend)),
+    }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def measure(urls: list[str], handler, repeat: int, rounds: int) -> dict:
+    """
+    `rounds` rounds of `repeat` passes over `urls`. Throughput and p50 are those
+    of the best round, p99 the median of the rounds' p99, so a noisy neighbour
+    slowing down one round does not read as a regression.
+    """
+    for url in urls:  # warm up lazy imports / parser init
+        handler(url)
+
+    throughputs, p50s, p99s = [], [], []
+    for _ in range(rounds):
+        timings = []
+        start_round = time.perf_counter()
+        for _ in range(repeat):
+            for url in urls:
+                start = time.perf_counter()
+                handler(url)
+                timings.append(time.perf_counter() - start)
+        throughputs.append(len(timings) / (time.perf_counter() - start_round))
+        p50s.append(statistics.median(timings))
+        p99s.append(_percentile(timings, 0.99))
+
+    gc.collect()
+    tracemalloc.start()
+    for url in urls:
+        handler(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "pages_per_sec": round(max(throughputs), 1),
+        "p50_ms": round(min(p50s) * 1000, 3),
+        "p99_ms": round(statistics.median(p99s) * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(case: str, result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """ Regressions of `result` against its baseline, as printable lines."""
+    regressions = []
+    for metric, higher_is_better in METRICS.items():
+        base = baseline.get(metric)
+        if not base:
+            continue
+        allowed = tolerance * 2 if metric == "p99_ms" else tolerance
+        change = result[metric] / base - 1
+        worse = -change if higher_is_better else change
+        if worse > allowed:
+            regressions.append(f"REGRESSION {case} {metric}: {result[metric]} vs baseline {base} "
+                               f"({change:+.0%}, allowed {allowed:.0%})")
+    return regressions
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=10, help="passes over the corpus per round")
+    arg_parser.add_argument("--rounds", type=int, default=5, help="timed rounds per case, the best one counts")
+    arg_parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown, 0.5 = 50%%")
+    arg_parser.add_argument("--baseline", default=BASELINE_PATH)
+    arg_parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    args = arg_parser.parse_args()
+    if args.repeat <= 0 or args.rounds <= 0 or args.tolerance < 0:
+        arg_parser.error("--repeat and --rounds must be positive, --tolerance not negative")
+
+    pages = _load("*.html")
+    if not pages:
+        print("no fixtures found")
+        return 1
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("cases", {})
+
+    logging.disable(logging.INFO)  # the handlers log every page
+    results, regressions = {}, []
+    print(f"{len(pages)} fixture pages, {args.rounds} rounds of {args.repeat} passes\n")
+    print(f"{'case':<22}{'pages/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak KB':>10}")
+    try:
+        for name in BACKENDS:
+            try:
+                backend = get_backend(name)
+            except CustomException:
+                print(f"{name:<22}not installed")
+                continue
+            for kind, (urls, handler) in _handlers(backend, pages).items():
+                if not urls:
+                    continue
+                case = f"{name}/{kind}"
+                results[case] = r = measure(urls, handler, args.repeat, args.rounds)
+                print(f"{case:<22}{r['pages_per_sec']:>10.1f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['peak_kb']:>10.1f}")
+                if case in baseline:
+                    regressions += compare(case, r, baseline[case], args.tolerance)
+                elif not args.update_baseline:
+                    print(f"{'':<22}no baseline recorded")
+    finally:
+        logging.disable(logging.NOTSET)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "repeat": args.repeat,
+                "rounds": args.rounds,
+                "cases": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+
+    print()
+    for line in regressions:
+        print(line)
+    print(f"{len(results)} cases, {len(regressions)} regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
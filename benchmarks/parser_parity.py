@@ -0,0 +1,95 @@
+"""
+Parser backend parity check over the fixture corpus (no network).
+
+Every installed backend, parsing the full page or only the detail container,
+must extract field-identical JobDetails / job URL lists, and match the expected
+values recorded in fixtures/internshala/expected.json (posted_date is left
+out there, it depends on today's date). Detail pages that differ only in their
+"Posted N days ago" label must keep the same fingerprint.
+
+Usage:
+    python -m benchmarks.parser_parity
+"""
+import os
+import sys
+import glob
+import re
+import json
+from dataclasses import asdict
+from src.core.exception import CustomException
+from src.scrapers.internshala._helpers.bf4_client import _parse_job_details, _parse_job_urls, _fingerprint
+from src.scrapers.internshala._helpers.html_backends import BACKENDS, get_backend
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "internshala")
+BASE_URL = "https://internshala.com"
+CONTAINER_ID = "details_container"
+
+
+def _installed_backends() -> list:
+    backends = []
+    for name in BACKENDS:
+        try:
+            backends.append(get_backend(name))
+        except CustomException:
+            print(f"skip: backend '{name}' not installed")
+    return backends
+
+
+def _extract(backend, path: str, container_id: str | None = None):
+    with open(path, "rb") as f:
+        content = f.read()
+    name = os.path.basename(path)
+    if name.startswith("listing_"):
+        return _parse_job_urls(content, BASE_URL, backend)
+    job = _parse_job_details(content, f"{BASE_URL}/fixture/{name}", backend, container_id=container_id)
+    return asdict(job)
+
+
+def _fingerprint_stable(path: str) -> bool:
+    with open(path, "rb") as f:
+        content = f.read()
+    aged = re.sub(rb"Posted [^<]*", b"Posted 5 days ago", content)
+    edited = content.replace(b"</h2>", b" (edited)</h2>", 1)
+    return (aged != content
+            and all(_fingerprint(content, cid) == _fingerprint(aged, cid) for cid in (None, CONTAINER_ID))
+            and _fingerprint(content, CONTAINER_ID) != _fingerprint(edited, CONTAINER_ID))
+
+
+def main() -> int:
+    with open(os.path.join(FIXTURES_DIR, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+
+    backends = _installed_backends()
+    failures = 0
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        name = os.path.basename(path)
+        outputs = {}
+        for backend in backends:
+            outputs[backend.name] = _extract(backend, path)
+            outputs[f"{backend.name}/partial"] = _extract(backend, path, CONTAINER_ID)
+        reference_name, reference = next(iter(outputs.items()))
+
+        for backend_name, output in outputs.items():
+            if output != reference:
+                failures += 1
+                print(f"FAIL {name}: '{backend_name}' differs from '{reference_name}'")
+
+        if name.startswith("detail_") and not _fingerprint_stable(path):
+            failures += 1
+            print(f"FAIL {name}: fingerprint changes with the posted date (or ignores an edit)")
+
+        want = expected.get(name)
+        if want is None:
+            print(f"warn {name}: no expected output recorded")
+            continue
+        got = {k: reference[k] for k in want} if isinstance(want, dict) else reference
+        if got != want:
+            failures += 1
+            print(f"FAIL {name}: output differs from expected.json")
+
+    print(f"{len(backends)} backends, {failures} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Full-document vs restricted (detail container only) parsing, per backend.
+
+For every installed backend and every detail fixture it reports:
+    - median parse + extract time per page
+    - tracemalloc peak of one parse (Python heap, what bs4 allocates)
+    - resident memory per live parsed tree (covers C allocations of lxml/selectolax,
+      Linux only: measured in a fresh process from /proc/self/statm while holding
+      `--hold` trees alive, so freed arenas of other runs can't hide it)
+
+Usage:
+    python -m benchmarks.partial_parse [--repeat 50] [--hold 300]
+"""
+import os
+import gc
+import sys
+import glob
+import time
+import argparse
+import statistics
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from src.core.exception import CustomException
+from src.scrapers.internshala._helpers.bf4_client import _parse_job_details
+from src.scrapers.internshala._helpers.html_backends import BACKENDS, get_backend
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "internshala")
+CONTAINER_ID = "details_container"
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _parse(backend, content: bytes, container_id: str | None):
+    if container_id:
+        return backend.parse_partial(content, container_id)
+    return backend.parse(content)
+
+
+def _rss_per_tree(backend_name: str, pages: list[bytes], container_id: str | None, hold: int) -> float | None:
+    backend = get_backend(backend_name)
+    _parse(backend, pages[0], container_id)  # warm up lazy imports / parser init
+    gc.collect()
+    before = _rss_bytes()
+    trees = [_parse(backend, pages[i % len(pages)], container_id) for i in range(hold)]
+    after = _rss_bytes()
+    del trees
+    if before is None or after is None:
+        return None
+    return (after - before) / hold
+
+
+def measure(backend, pages: list[bytes], container_id: str | None, repeat: int, hold: int) -> dict:
+    # time: parse + single-pass extraction, as the scraper runs it
+    timings = []
+    for _ in range(repeat):
+        for content in pages:
+            start = time.perf_counter()
+            _parse_job_details(content, "bench", backend, container_id=container_id)
+            timings.append(time.perf_counter() - start)
+
+    # python heap peak for one page (warm, lazy initialisation excluded)
+    gc.collect()
+    tracemalloc.start()
+    _parse(backend, pages[0], container_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # resident memory per live tree, in a clean process
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        rss = pool.submit(_rss_per_tree, backend.name, pages, container_id, hold).result()
+
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "py_peak_kb": peak / 1024,
+        "rss_kb": rss / 1024 if rss is not None else None,
+    }
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=50)
+    arg_parser.add_argument("--hold", type=int, default=300)
+    args = arg_parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "detail_*.html"))):
+        with open(path, "rb") as f:
+            pages.append(f.read())
+    if not pages:
+        print("no detail fixtures found")
+        return 1
+
+    print(f"{len(pages)} detail pages, container '#{CONTAINER_ID}'\n")
+    print(f"{'backend':<12}{'mode':<9}{'median ms':>10}{'py peak KB':>12}{'RSS KB/tree':>13}")
+    for name in BACKENDS:
+        try:
+            backend = get_backend(name)
+        except CustomException:
+            print(f"{name:<12}not installed")
+            continue
+
+        results = {}
+        for mode, container_id in (("full", None), ("partial", CONTAINER_ID)):
+            results[mode] = r = measure(backend, pages, container_id, args.repeat, args.hold)
+            rss = f"{r['rss_kb']:.1f}" if r["rss_kb"] is not None else "n/a"
+            print(f"{name:<12}{mode:<9}{r['median_ms']:>10.3f}{r['py_peak_kb']:>12.1f}{rss:>13}")
+
+        speedup = results["full"]["median_ms"] / results["partial"]["median_ms"]
+        print(f"{'':<12}{'':<9}{speedup:>9.1f}x faster\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
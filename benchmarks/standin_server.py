@@ -0,0 +1,332 @@
+"""
+Local Internshala stand-in: an HTTP server generating search result and job
+detail pages in Internshala's markup, so crawls can be load-tested offline.
+
+Routes (any host path works, as built by compile_url / page_url):
+    .../detail/<slug>-<id>         job details page, fields derived from <id>
+    <search path>[/page-N/]        search results, `--per-page` cards a page,
+                                   `--listings` per search, empty past the last page
+    /__stats                       JSON request / status counters
+
+Faults, drawn per request from a seeded RNG:
+    --latency S        response delay, uniform in [0, 2*S] seconds
+    --error-rate P     share of 500 responses (retried by the scraper)
+    --missing-rate P   share of 404 detail pages (skipped by the scraper)
+    --burst-every S    every S seconds the first --burst-length seconds answer
+                       429 with a Retry-After, like a throttling front end
+
+Usage:
+    python -m benchmarks.standin_server [--port 8765] [--listings 2000] [--latency 0.05]
+"""
+import re
+import sys
+import gzip
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+from dataclasses import dataclass, asdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DETAIL_RE = re.compile(r"/detail/[^/]*?-(\d+)/?$")
+PAGE_RE = re.compile(r"/page-(\d+)/?$")
+
+PROFILES = ["Machine Learning", "Data Science", "Web Development", "Content Writing", "Graphic Design",
+            "Marketing", "Data Analyst", "Python Development", "Business Development", "Android Development"]
+CITIES = ["Mumbai", "Pune", "Bangalore", "Delhi", "Hyderabad", "Chennai", "Kolkata", "Work From Home"]
+SKILLS = ["Python", "SQL", "Machine Learning", "Pandas", "MS-Excel", "Power BI", "JavaScript", "React",
+          "English Proficiency (Written)", "Canva", "Figma", "Django", "Docker", "Git"]
+PERKS = ["Certificate", "Letter of recommendation", "Flexible work hours", "5 days a week", "Free snacks & beverages"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+@dataclass
+class StandinOptions:
+    listings: int = 2000
+    per_page: int = 40
+    latency: float = 0.05
+    error_rate: float = 0.0
+    missing_rate: float = 0.0
+    burst_every: float = 0.0
+    burst_length: float = 2.0
+    gzip: bool = True
+    seed: int = 0
+
+
+def _chrome(title: str, body: str) -> str:
+    """ Page head, navigation and footer around `body`, sized like the live site's."""
+    styles = "\n".join(f"      .gen_{i} {{ margin: {i}px; padding: {i}px; color: #{i:06d}; }}" for i in range(120))
+    nav = "\n".join(f'            <li class="nav-item"><a class="nav-link" href="/internships/category-{i}">Category {i}</a></li>'
+                    for i in range(40))
+    footer = "\n".join(f'        <a class="footer_link" href="/about/{i}">Footer link {i}</a>' for i in range(60))
+    return f"""<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8">
+    <title>{title} | Internshala</title>
+    <style>
+{styles}
+    </style>
+    <script>window.dataLayer = window.dataLayer || []; function gtag(){{dataLayer.push(arguments);}}</script>
+  </head>
+  <body>
+    <header>
+      <nav class="navbar">
+        <div class="collapse navbar-collapse">
+          <ul class="navbar-nav">
+{nav}
+          </ul>
+        </div>
+      </nav>
+    </header>
+{body}
+    <footer>
+      <div class="footer_links">
+{footer}
+      </div>
+    </footer>
+  </body>
+</html>
+"""
+
+
+def listing_page(search_path: str, page: int, opts: StandinOptions) -> str:
+    """ Search results page `page` of `search_path`, ids are stable per search and page."""
+    base = (zlib.crc32(search_path.encode()) % 1000) * 1_000_000
+    first = (page - 1) * opts.per_page
+    cards = []
+    for index in range(first, min(first + opts.per_page, opts.listings)):
+        job_id = base + index
+        profile = PROFILES[job_id % len(PROFILES)]
+        slug = f"{profile.lower().replace(' ', '-')}-internship-at-company-{job_id % 97}"
+        cards.append(f"""      <div class="container-fluid individual_internship visibilityTrackerItem" internshipid="{job_id}">
+        <div class="internship_meta">
+          <h3 class="job-internship-name">
+            <a class="job-title-href" href="/internship/detail/{slug}-{job_id}">{profile} {index}</a>
+          </h3>
+          <p class="company-name">Company {job_id % 97}</p>
+          <div class="row-1-item locations"><span><a href="/internships/work-from-home-jobs">{CITIES[job_id % len(CITIES)]}</a></span></div>
+          <div class="row-1-item"><span class="stipend">&#8377; {(job_id % 9 + 1) * 1000:,} /month</span></div>
+          <div class="status status-small status-success"><div>Posted {job_id % 7 + 1} days ago</div></div>
+        </div>
+      </div>""")
+    body = f'    <div id="internship_list_container_1">\n' + "\n".join(cards) + "\n    </div>"
+    return _chrome("Internships", body)
+
+
+def detail_page(job_id: int) -> str:
+    """ Job details page of `job_id`, every field derived from the id."""
+    rng = random.Random(job_id)
+    profile = PROFILES[job_id % len(PROFILES)]
+    company = f"Company {job_id % 97}"
+    skills = "\n".join(f'            <span class="round_tabs">{s}</span>' for s in rng.sample(SKILLS, rng.randint(2, 5)))
+    perks = "\n".join(f'            <span class="round_tabs">{p}</span>' for p in rng.sample(PERKS, rng.randint(1, 3)))
+    duties = "".join(f"<li>Responsibility {i} of {profile.lower()} role {job_id}</li>" for i in range(rng.randint(3, 8)))
+    similar = "\n".join(f"""        <div class="similar_internship_card">
+          <div class="similar_profile">{PROFILES[(job_id + i) % len(PROFILES)]}</div>
+          <div class="similar_company">Company {(job_id + i) % 97}</div>
+          <a class="view_detail_button" href="/internship/detail/similar-{job_id + i}">View details</a>
+        </div>""" for i in range(1, 13))
+    body = f"""    <div class="detail_view" id="details_container">
+      <div class="individual_internship visibilityTrackerItem" internshipid="{job_id}">
+        <div class="internship_meta">
+          <div class="individual_internship_header">
+            <div class="company">
+              <div class="heading_4_5 profile">{profile}</div>
+              <div class="heading_6 company_name">
+                <div class="company_and_premium"><a href="/company/{job_id % 97}" target="_blank">{company}</a></div>
+              </div>
+            </div>
+          </div>
+          <div id="location_names"><span><a class="location_link" href="/jobs/in-city">{CITIES[job_id % len(CITIES)]}</a></span></div>
+          <div class="internship_other_details_container">
+            <div class="other_detail_item_row">
+              <div class="other_detail_item">
+                <div class="item_heading"><span>Start date</span></div>
+                <div class="item_body" id="start-date-first"><span class="start_immediately_desktop">Immediately</span></div>
+              </div>
+              <div class="other_detail_item">
+                <div class="item_heading"><span>Duration</span></div>
+                <div class="item_body">{rng.randint(1, 6)} Months</div>
+              </div>
+            </div>
+            <div class="other_detail_item_row">
+              <div class="other_detail_item stipend_container">
+                <div class="item_heading"><span>Stipend</span></div>
+                <div class="item_body"><span class="stipend">&#8377; {rng.randint(2, 25) * 1000:,} /month</span></div>
+              </div>
+              <div class="other_detail_item apply_by">
+                <div class="item_heading"><span>Apply By</span></div>
+                <div class="item_body">{rng.randint(1, 28)} {rng.choice(MONTHS)}' 26</div>
+              </div>
+            </div>
+          </div>
+          <div class="tags_container_outer">
+            <div class="status-container">
+              <div class="status status-small status-success"><div>Posted {job_id % 7 + 1} days ago</div></div>
+            </div>
+          </div>
+        </div>
+        <div class="internship_details">
+          <h2 class="section_heading heading_5_5 about_heading">About the internship</h2>
+          <div class="text-container"><p>Selected intern's day-to-day responsibilities include:</p><ol>{duties}</ol></div>
+          <h3 class="section_heading heading_5_5 skills_heading">Skill(s) required</h3>
+          <div class="round_tabs_container">
+{skills}
+          </div>
+          <h3 class="section_heading heading_5_5 perks_heading">Perks</h3>
+          <div class="round_tabs_container">
+{perks}
+          </div>
+          <h3 class="section_heading heading_5_5">Number of openings</h3>
+          <div class="text-container">{rng.randint(1, 10)}</div>
+          <h2 class="section_heading heading_5_5">About {company}</h2>
+          <div class="text-container website_link"><a href="https://company{job_id % 97}.example.com" target="_blank">Website</a></div>
+          <div class="text-container about_company_text_container">{company} is a made up company number {job_id % 97}.</div>
+        </div>
+      </div>
+    </div>
+    <div id="similar_internships_container" class="recommendations">
+{similar}
+    </div>"""
+    return _chrome(profile, body)
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Threaded stand-in server, keep-alive (HTTP/1.1) like the live site.
+
+    Args:
+        host, port: Address to bind, port 0 picks a free one.
+        options (StandinOptions): Corpus size and faults.
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, options: StandinOptions | None = None):
+        super().__init__((host, port), _Handler)
+        self.options = options or StandinOptions()
+        self.started = time.monotonic()
+        self.rng = random.Random(self.options.seed)
+        self.counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandinServer":
+        """ Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="standin-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def count(self, key: str):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def draw(self) -> float:
+        with self._lock:
+            return self.rng.random()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"uptime_s": round(time.monotonic() - self.started, 1), "options": asdict(self.options), **self.counts}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandinServer
+
+    def log_message(self, format, *args):
+        pass  # one line per request would dominate a load test
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=utf-8", headers: dict | None = None):
+        if self.server.options.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            headers = {**(headers or {}), "Content-Encoding": "gzip"}
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(str(status))
+
+    def do_GET(self):
+        opts, server = self.server.options, self.server
+        path = self.path.split("?", 1)[0]
+        if path == "/__stats":
+            self._send(200, json.dumps(server.stats()).encode(), "application/json")
+            return
+        server.count("requests")
+
+        if opts.latency > 0:
+            time.sleep(server.draw() * 2 * opts.latency)
+
+        if opts.burst_every > 0:
+            into_period = (time.monotonic() - server.started) % opts.burst_every
+            if into_period < opts.burst_length:
+                retry_after = max(1, round(opts.burst_length - into_period))
+                self._send(429, b"Too Many Requests", "text/plain", {"Retry-After": str(retry_after)})
+                return
+        if server.draw() < opts.error_rate:
+            self._send(500, b"Internal Server Error", "text/plain")
+            return
+
+        detail = DETAIL_RE.search(path)
+        if detail:
+            if server.draw() < opts.missing_rate:
+                self._send(404, b"Not Found", "text/plain")
+                return
+            server.count("detail_pages")
+            self._send(200, detail_page(int(detail.group(1))).encode())
+            return
+
+        page = PAGE_RE.search(path)
+        search_path = PAGE_RE.sub("/", path) if page else path
+        server.count("listing_pages")
+        self._send(200, listing_page(search_path, int(page.group(1)) if page else 1, opts).encode())
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    defaults = StandinOptions()
+    for name, value in asdict(defaults).items():
+        flag = "--" + name.replace("_", "-")
+        if isinstance(value, bool):
+            arg_parser.add_argument(flag, action=argparse.BooleanOptionalAction, default=value)
+        else:
+            arg_parser.add_argument(flag, type=type(value), default=value)
+    args = vars(arg_parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+
+    server = StandinServer(host, port, StandinOptions(**args))
+    print(f"stand-in serving on {server.base_url} ({server.options.listings} listings per search)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,10 @@ from dataclasses import asdict
 from airflow.decorators import dag, task
 from airflow.exceptions import AirflowSkipException, AirflowFailException
 from datetime import datetime
+import time
 from src.core.logger import airflow_logger as logger
 import hashlib
+import functools
 import os
 import dotenv
 
@@ -16,12 +18,85 @@ mongo_config = {
     "collection_name": 'job_details',  # mongo/init
     "service": "mongo_db"  # from docker-compose file
 }
+# URLs that failed to scrape, kept for replay
+dead_letter_config = {**mongo_config, "collection_name": "dead_letters"}
+# replay_dead_letters re-feeds at most this many dead letters per run
+dead_letter_replay_limit = 200
+# URL work queue shared by the scrape_persist workers (docker-compose redis service),
+# with use_work_queue off URL lists are handed over through XCom instead.
+# USE_WORK_QUEUE=1/0 if set, else on only when REDIS_HOST is configured
+use_work_queue = os.environ.get("USE_WORK_QUEUE", "1" if os.environ.get("REDIS_HOST") else "0").strip().lower() in ("1", "true", "yes")
+work_queue_name = "internshala:urls"
+redis_config = {
+    "host": os.environ.get("REDIS_HOST", "redis"),
+    "port": int(os.environ.get("REDIS_PORT", 6379)),
+    "lease_seconds": 600,  # a claimed batch must be persisted and acked within this time
+}
+# scrape_persist flushes to Mongo every N jobs or T seconds
+sink_batch_size = 25
+sink_flush_interval = 30.0
+# scrape_persist runs as one mapped task per shard (queue worker), at most `max_active_shards` at once
+scrape_shards = 4
+max_active_shards = 2
 
 #Function for using hash as id
 def make_id(url: str) -> str:
     """Generate a stable Mongo _id from a URL."""
     return hashlib.md5(url.encode()).hexdigest()
 
+
+def flush_logs(func):
+    """
+    Write the queued log records (LOG_QUEUE=1) when the task ends: Airflow's forked
+    task runners exit with os._exit(), which skips the atexit flush.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            from src.core.logger import flush
+            flush()
+    return wrapper
+
+
+def with_metrics(func):
+    """
+    Scope the pipeline metrics (fetch, parse, extract, dedup, Mongo write) to one task:
+    log the per-stage summary when it ends and write them to `Constants.metrics_dir/<task>.prom`.
+    With profiling on (`PROFILE=1` or `profile_enabled` in the scraper config) the task is also
+    profiled into its run's log folder (<task>-*.prof / .folded, see src.core.profiling).
+    Queued log records are flushed at the end, see flush_logs.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        from src.core import ScraperConfig
+        from src.core.metrics import task_metrics
+        from src.core.profiling import profile, profiling_enabled
+        from src.core.utils import get_airflow_context
+        context = get_airflow_context()
+        task_name = context[-1] if context else func.__name__
+        cfg = ScraperConfig.load_default_cfg()
+        with task_metrics(task_name) as registry, \
+             profile(task_name, context_str=context[0] if context else None,
+                     enabled=profiling_enabled(cfg), interval=cfg.profile_sample_interval):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                logger.info("Stage metrics: %s", registry.summary(), ctx=context)
+    return flush_logs(wrapper)
+
+
+def shard_urls(urls: list[str], shards: int) -> list[dict]:
+    """
+    Partition URLs by their `make_id` hash, so a URL always lands in the same shard.
+    Returns the non-empty shards as {"shard": index, "urls": [...]}.
+    """
+    buckets = [[] for _ in range(max(1, shards))]
+    for url in urls:
+        buckets[int(make_id(url), 16) % len(buckets)].append(url)
+    return [{"shard": i, "urls": bucket} for i, bucket in enumerate(buckets) if bucket]
+
                 
 @dag(
     dag_id="internshala_scraper_pipeline",
@@ -35,18 +110,32 @@ def intershala_scraper_pipline():
     user_config = ScraperConfig().load_default_cfg()
     
     @task(task_id="compile")
+    @with_metrics
     def compile_urls():
         """
-        This task compiles and scraps Job Urls from the source.
+        This task compiles and scraps Job Urls from the source, searches are paged concurrently.
         """
+        import asyncio
         from src.scrapers import InternshalaScraper
+        from src.db_services import MongoClient, SeenUrlIndex
         from src.core.utils import get_airflow_context
         context = get_airflow_context()
-        scraper = InternshalaScraper(user_config)
+        task_id = context[-1] if context else None
         
-        # Compile and scrape source Urls
+        # Compile and scrape source Urls, paging stops once a page holds only stored jobs
         logger.info("Compiling Job links to scrape", ctx=context)
-        urls = scraper.build_urls()
+        with InternshalaScraper(user_config) as scraper, \
+             MongoClient(**mongo_config, task_id=task_id) as db, \
+             SeenUrlIndex() as seen:
+            if seen.stale:
+                seen.rebuild_from(db)
+
+            def known_urls(page_urls):
+                url_to_id = {url: make_id(url) for url in page_urls}
+                existing = seen.existing(url_to_id.values(), db.existing_ids)
+                return [url for url, hid in url_to_id.items() if hid in existing]
+
+            urls = asyncio.run(scraper.build_urls_async(known_urls=known_urls))
         if len(urls) > 0:
             logger.info("Successfully collected Target URLs", ctx=context)
             return urls
@@ -56,94 +145,297 @@ def intershala_scraper_pipline():
         
     
     @task(task_id="filter")
+    @with_metrics
     def filter_url(urls):
         """
         Filter out URLs already present in MongoDB.
-        Returns only new (not yet stored) URLs.
+        Keeps new (not yet stored) URLs, plus stored ones the re-scrape policy finds due,
+        and pushes them to the work queue (returns their count), or returns them for XCom.
         """
         if not urls:
             raise AirflowSkipException("No URLs provided to filter task.")
         
-        from src.db_services import MongoClient
+        from src.db_services import MongoClient, SeenUrlIndex, RedisWorkQueue
+        from src.core import RescrapePolicy
+        from src.core.rescrape import utc_now_iso
         from src.core.utils import get_airflow_context
 
         context = get_airflow_context()
-        if context:
-            task_id = context[-1]
+        task_id = context[-1] if context else None
 
         # Map each URL to its hash (_id in Mongo)
         url_to_id = {url: make_id(url) for url in urls}
-        hashed_ids = list(url_to_id.values())
 
-        # Query existing docs whose _id is in our hash list
-        with MongoClient(**mongo_config, task_id=task_id) as db:
-            existing_docs = db.find({"_id": {"$in": hashed_ids}})
+        # Ids already stored: local bloom filter first, only probable hits are
+        # confirmed with chunked $in queries served from the _id index
+        with MongoClient(**mongo_config, task_id=task_id) as db, SeenUrlIndex() as seen:
+            if seen.stale:
+                seen.rebuild_from(db)
+            existing_ids = seen.existing(url_to_id.values(), db.existing_ids)
+
+            # Jobs stored before re-scraping existed count as checked now, they age from here
+            backfilled = db.touch_where({"last_checked": None}, {"last_checked": utc_now_iso()})
+            if backfilled:
+                logger.info("Backfilled last_checked on %s stored jobs", backfilled, ctx=context)
 
-        existing_ids = {doc["_id"] for doc in existing_docs}
+            # Stored jobs whose TTL ran out (at most rescrape_max_per_run), the query skips
+            # removed, closed and recently checked ones, only the fields the policy reads are streamed
+            policy = RescrapePolicy.from_config(user_config)
+            stored = db.iter_find(policy.query(), projection=policy.projection, batch_size=1000, keyset=True)
+            closed_ids = []
+            due_urls = [doc["url"] for doc in policy.select(stored, on_closed=lambda doc: closed_ids.append(doc["_id"]))
+                        if doc.get("url")]
+            # Jobs past their apply-by date are flagged once, later runs no longer stream them
+            if closed_ids:
+                db.touch_many(closed_ids, {"closed": True})
+                logger.info("Flagged %s stored jobs past their apply-by date as closed", len(closed_ids), ctx=context)
 
         # Keep only URLs whose hash is not in existing_ids
         new_urls = [url for url, hid in url_to_id.items() if hid not in existing_ids]
 
         logger.info(
-            f"Filter task: total={len(urls)}, existing={len(existing_ids)}, new={len(new_urls)}",
+            "Filter task: total=%s, existing=%s, new=%s, due for re-scrape=%s",
+            len(urls), len(existing_ids), len(new_urls), len(due_urls),
             ctx=context
         )
 
-        if not new_urls:
+        if not new_urls and not due_urls:
             raise AirflowSkipException("No new URLs to scrape.")
 
-        return new_urls
+        urls = list(dict.fromkeys(new_urls + due_urls))
+        if not use_work_queue:
+            return urls
+        with RedisWorkQueue(work_queue_name, task_id=task_id, **redis_config) as queue:
+            queue.push(urls)
+            logger.info("Work queue '%s': %s", work_queue_name, queue.stats(), ctx=context)
+        return len(urls)
     
     
-    @task(task_id="scrape_persist")
-    def scrape_persist(urls):
+    @task(task_id="shard")
+    @flush_logs
+    def shard(urls):
         """
-        This task, scrapes Internshala job details and saves them to MongoDb.
+        Split the URLs into hash shards, one mapped scrape_persist task each.
+        In work queue mode (`urls` is the queued count) every shard is a worker draining the queue.
+        """
+        from src.core.utils import get_airflow_context
+        context = get_airflow_context()
+
+        if use_work_queue:
+            workers = max(1, min(scrape_shards, urls))
+            logger.info("Starting %s queue workers for %s queued URLs", workers, urls, ctx=context)
+            return [{"shard": i, "queue": work_queue_name} for i in range(workers)]
+
+        shards = shard_urls(urls, scrape_shards)
+        logger.info("Sharded %s URLs into %s shards: %s", len(urls), len(shards), [len(s['urls']) for s in shards], ctx=context)
+        return shards
+
+
+    @task(task_id="scrape_persist", max_active_tis_per_dagrun=max_active_shards)
+    @with_metrics
+    def scrape_persist(shard):
+        """
+        This task, scrapes one shard of Internshala job details and saves them to MongoDb.
+        Up to `max_concurrency` pages of a batch are fetched at once (aiter_scrape).
+        Re-scraped pages whose content fingerprint is unchanged are neither parsed
+        nor rewritten, only their `last_checked` is bumped.
+        Returns the shard's metrics.
         """
         # Imports
+        import asyncio
         from src.core.utils import get_airflow_context
+        from src.core.rescrape import utc_now_iso
         from src.scrapers import InternshalaScraper
-        from src.db_services import MongoClient
+        from src.db_services import MongoClient, MongoBufferedSink, SeenUrlIndex, RedisWorkQueue, MongoDeadLetterStore
+        from src.core.journal import ScrapeJournal
+        from src.core.metrics import metrics
+        from contextlib import nullcontext
         
         # inti task context & scraper
         context = get_airflow_context()
-        scraper = InternshalaScraper(user_config)
+        task_id = context[-1] if context else None
+        shard_id = shard["shard"]
+        metrics.set_labels(shard=shard_id)
+        start = time.monotonic()
                 
-        # Scrape
-        jobs = scraper.scrape(urls, limit=5)    
-        jobs = [asdict(job) for job in jobs] # store as dict for mongo
-        logger.info(f"Successfully scraped {len(jobs)} Jobs", ctx=context)
-        
-        # make hash ids
-        for job in jobs:
-            job["_id"] = make_id(job["url"])
-            
-        # Mongo persist
-        with MongoClient(**mongo_config) as db:
-            ids = db.insert(jobs)
-            if ids:
-                logger.info(f"Finnised inserting {len(ids)} records MongoDB", ctx=context)
-            else:
-                logger.error(f"Error occured wile inserting record, refer to db_log", ctx=context)
+        # Scrape and persist as jobs come in, a failure only loses the unflushed batch.
+        # Upserts keep task retries and re-crawls idempotent.
+        # XCom shards resume from a per-run journal on retry, queue leases cover that in queue mode
+        persisted, unchanged, removed, claimed = [], [], [], 0
+        use_journal = "queue" not in shard and context is not None
+        with InternshalaScraper(user_config) as scraper, \
+             MongoClient(**mongo_config, task_id=task_id) as db, \
+             MongoClient(**dead_letter_config, task_id=task_id) as dead_letter_db, \
+             (RedisWorkQueue(shard["queue"], task_id=task_id, **redis_config) if "queue" in shard else nullcontext()) as queue, \
+             (ScrapeJournal(f"{context[0]}_shard-{shard_id}") if use_journal else nullcontext()) as journal:
+
+            # a failing page is dead-lettered, the rest of the shard goes on
+            dead_letters = MongoDeadLetterStore(dead_letter_db, run_id=context[0] if context else None)
+            failed = []
+            def on_error(url, error):
+                failed.append(url)
+                dead_letters.record(url, error)
+
+            # a batch is fetched `max_concurrency` pages at a time, each job is written as it comes
+            async def scrape_batch(urls, fingerprints):
+                jobs = scraper.aiter_scrape(urls, fingerprints=fingerprints,
+                                            on_unchanged=lambda page: unchanged.append(make_id(page.url)),
+                                            on_removed=lambda page: removed.append(make_id(page.url)),
+                                            on_error=on_error)
+                async for job in jobs:
+                    doc = asdict(job) # store as dict for mongo
+                    doc["_id"] = make_id(doc["url"])
+                    sink.write(doc)
+                    persisted.append(doc["_id"])
+
+            with MongoBufferedSink(db, batch_size=sink_batch_size, flush_interval=sink_flush_interval, upsert=True) as sink:
+                # queue workers claim leased batches until the queue is drained
+                if queue is not None:
+                    batches = queue.batches(sink_batch_size)
+                else:
+                    todo = list(journal.remaining(shard["urls"])) if journal is not None else shard["urls"]
+                    batches = [todo[i:i + sink_batch_size] for i in range(0, len(todo), sink_batch_size)]
+                for urls in batches:
+                    claimed += len(urls)
+                    # leases are renewed while the batch is scraped, however slow the site is
+                    with (queue.keep_alive(urls) if queue is not None else nullcontext()):
+                        # stored fingerprints of the urls being re-scraped
+                        stored = db.iter_find({"_id": {"$in": [make_id(url) for url in urls]}, "fingerprint": {"$ne": None}},
+                                              projection={"url": 1, "fingerprint": 1})
+                        fingerprints = {doc["url"]: doc["fingerprint"] for doc in stored}
+
+                        asyncio.run(scrape_batch(urls, fingerprints))
+
+                        # ack only once the batch is in Mongo, unacked leases are requeued
+                        sink.flush(reason="batch")
+
+                    if queue is not None:
+                        queue.ack(urls)
+                    if journal is not None:
+                        for url in urls:
+                            journal.mark_done(url)
+
+            if unchanged:
+                db.touch_many(unchanged, {"last_checked": utc_now_iso()})
+                logger.info("%s re-scraped jobs unchanged, bumped last_checked", len(unchanged), ctx=context)
+            # stored jobs whose page is gone leave the re-scrape set (RescrapePolicy.closed)
+            if removed:
+                marked = db.touch_many(removed, {"removed": True, "last_checked": utc_now_iso()})
+                logger.info("%s pages answered 404, %s stored jobs marked removed", len(removed), marked, ctx=context)
+
+        # Record the stored ids, next runs skip the db for urls never seen
+        with SeenUrlIndex() as seen:
+            if not seen.stale:
+                seen.add(persisted)
+
+        report = sink.report
+        logger.info("Shard %s: successfully scraped %s Jobs", shard_id, report.docs, ctx=context)
+        if report.written:
+            logger.info("Shard %s: finnised inserting %s records MongoDB | %s", shard_id, report.written, report.summary(), ctx=context)
+        elif not unchanged:
+            logger.error("Shard %s: no records inserted into MongoDB, refer to db_log | %s", shard_id, report.summary(), ctx=context)
+
+        shard_metrics = {
+            "shard": shard_id,
+            "urls": claimed,
+            "scraped": report.docs,
+            "written": report.written,
+            "duplicates": report.duplicates,
+            "unchanged": len(unchanged),
+            "dead_lettered": len(failed),
+            "skipped": len(removed),  # 404s
+            "seconds": round(time.monotonic() - start, 1),
+            "fetch": scraper.fetch_stats(),
+        }
+        logger.info("Shard metrics: %s", shard_metrics, ctx=context)
+        return shard_metrics
     
     
+    @task(task_id="replay_dead_letters", trigger_rule="all_done")
+    @with_metrics
+    def replay_dead_letters(shard_metrics):
+        """
+        This task re-scrapes the oldest dead letters in bulk and saves the ones that now succeed.
+        URLs failing again stay dead-lettered with a higher failure count.
+        Runs however the scrape ended (nothing new to scrape, failed shards), older dead letters are still due.
+        Returns the shard metrics plus the replay's.
+        """
+        from src.core.utils import get_airflow_context
+        from src.scrapers import InternshalaScraper
+        from src.db_services import MongoClient, MongoBufferedSink, MongoDeadLetterStore, SeenUrlIndex
+
+        context = get_airflow_context()
+        task_id = context[-1] if context else None
+
+        # this run's failures were just retried by the fetch layer, only replay older ones
+        run_id = context[0] if context else None
+        recovered = []
+        with InternshalaScraper(user_config) as scraper, \
+             MongoClient(**mongo_config, task_id=task_id) as db, \
+             MongoClient(**dead_letter_config, task_id=task_id) as dead_letter_db:
+            dead_letters = MongoDeadLetterStore(dead_letter_db, run_id=run_id)
+            with MongoBufferedSink(db, batch_size=sink_batch_size, flush_interval=sink_flush_interval, upsert=True) as sink:
+                for job in scraper.iter_replay(dead_letters, limit=dead_letter_replay_limit, exclude_run_id=run_id):
+                    doc = asdict(job) # store as dict for mongo
+                    doc["_id"] = make_id(doc["url"])
+                    sink.write(doc)
+                    recovered.append(doc["_id"])
+            remaining = len(dead_letters)
+
+        # Record the recovered ids, as scrape_persist does, so they don't look new until the next rebuild
+        with SeenUrlIndex() as seen:
+            if not seen.stale:
+                seen.add(recovered)
+
+        report = sink.report
+        logger.info("Recovered %s dead letters, %s left | %s", report.docs, remaining, report.summary(), ctx=context)
+        return {"shard_metrics": list(shard_metrics or []), "recovered": report.docs, "dead_letters": remaining}
+
+
     @task(task_id="retrive")
-    def retrive():
+    @flush_logs
+    def retrive(metrics):
         """
-        This Task checks if data was inserted correctly
+        This Task checks if data was inserted correctly, and sums up the shard metrics
         """
         from src.db_services import MongoClient
         from src.core.utils import get_airflow_context
         
         context = get_airflow_context()
+
+        shard_metrics = [m for m in metrics["shard_metrics"] if m]
+        if shard_metrics:
+            totals = {key: sum(m[key] for m in shard_metrics) for key in ("urls", "scraped", "written", "unchanged", "dead_lettered")}
+            slowest = max(shard_metrics, key=lambda m: m["seconds"])
+            logger.info("%s shards: %s, slowest shard %s took %ss",
+                        len(shard_metrics), totals, slowest['shard'], slowest['seconds'], ctx=context)
+        logger.info("Dead letters: %s recovered, %s left", metrics['recovered'], metrics['dead_letters'], ctx=context)
         
         logger.info("Retriving records from MongoDB", ctx=context)
         with MongoClient(**mongo_config) as db:
-            rows = db.find()
-            if rows:
-                logger.info(f"Successfully retrived {len(rows)} records from MongoDB, and 1st id is {rows[0]['_id']} and hash for url is {make_id(rows[0]['url'])}", ctx=context)
+            # stream ids and urls only, the collection never has to fit in worker memory
+            count, mismatched, first = 0, 0, None
+            for row in db.iter_find(projection={"url": 1}, batch_size=1000, keyset=True):
+                count += 1
+                first = first or row
+                if row.get("url") and row["_id"] != make_id(row["url"]):
+                    mismatched += 1
+            if first:
+                logger.info("Successfully retrived %s records from MongoDB, and 1st id is %s and hash for url is %s",
+                            count, first['_id'], make_id(first['url']), ctx=context)
+                if mismatched:
+                    logger.warning("%s records have an _id that does not match their url hash", mismatched, ctx=context)
             else:
                 logger.error("Error retriving the records.", ctx=context)
+
+
+    @task(task_id="shards_failed", trigger_rule="one_failed", retries=0)
+    def shards_failed():
+        """
+        Fail the run when a scrape_persist shard (or a task before them) failed:
+        replay and retrive still run after it, and a run's state only follows its last tasks.
+        """
+        raise AirflowFailException("Scraping failed, see the failed scrape_persist shards or upstream tasks.")
             
             
             
@@ -154,12 +446,18 @@ def intershala_scraper_pipline():
     # Task chaining
     raw_url = compile_urls()
     filter = filter_url(raw_url)
-    scraped = scrape_persist(filter)
-    retrive_task = retrive()
+    shards = shard(filter)
+    scraped = scrape_persist.expand(shard=shards)
+    replayed = replay_dead_letters(scraped)
+    retrive_task = retrive(replayed)
+    failed_shards = shards_failed()
     
     raw_url.set_downstream(filter)
-    filter.set_downstream(scraped)
-    scraped.set_downstream(retrive_task)
+    filter.set_downstream(shards)
+    shards.set_downstream(scraped)
+    scraped.set_downstream(replayed)
+    replayed.set_downstream(retrive_task)
+    scraped.set_downstream(failed_shards)
     
 
 
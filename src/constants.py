@@ -18,6 +18,24 @@ class Constants:
     # Config.json
     config_path = os.path.join(src_dir, "config", "scraper_config.json")
     
+    # Job details field extraction spec
+    fields_spec_path = os.path.join(src_dir, "config", "internshala_fields.json")
+    
+    # Persistent seen-url (stored _id) bloom filter
+    seen_index_path = os.path.join(artifacts_dir, "seen_urls.bloom")
+    
+    # URLs that failed to scrape, for replay
+    dead_letters_path = os.path.join(artifacts_dir, "dead_letters.jsonl")
+    
+    # Recorded HTTP responses for offline replay
+    cassettes_dir = os.path.join(artifacts_dir, "cassettes")
+    
+    # Prometheus text files of the pipeline metrics, one per task
+    metrics_dir = os.path.join(artifacts_dir, "metrics")
+    
+    # Per-run scrape progress journals
+    journals_dir = os.path.join(artifacts_dir, "journals")
+    
     # Logs path
     logs_path = os.path.join(artifacts_dir, "logs")
     os.makedirs(logs_path, exist_ok=True)
@@ -16,6 +16,17 @@ Modules:
         - Logging configuration and setup
         - Provides scraper_logger for consistent logging across modules
     
+    metrics.py:
+        - metrics: process-wide counters / latency histograms of fetch, parse, extract, dedup and Mongo writes
+        - Prometheus text export (file or local endpoint), task_metrics() scope for Airflow tasks
+    
+    profiling.py:
+        - profile(): opt-in cProfile + sampled collapsed stacks (flamegraph) of a task, next to its logs
+        - profiled: decorator enabling it on scraper methods via `profile_enabled` / PROFILE=1
+    
+    rescrape.py:
+        - RescrapePolicy: per-field TTLs and apply-by horizon deciding which stored jobs to fetch again
+    
     models.py:
         - JobDetails: Data model for storing job information
         - Contains fields for job attributes (title, company, location, etc.)
@@ -29,6 +40,7 @@ Modules:
 from .config import ScraperConfig
 from .exception import CustomException
 from .models import JobDetails
+from .rescrape import RescrapePolicy
 from . import utils
 from . import logger
 
@@ -36,6 +48,7 @@ __all__ = [
     "ScraperConfig",
     "CustomException", 
     "JobDetails",
+    "RescrapePolicy",
     "utils",
     "logger"
 ]
\ No newline at end of file
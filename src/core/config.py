@@ -23,6 +23,34 @@ class ScraperConfig:
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
     })
     experience_years: int = 0
+    max_concurrency: int = 8
+    per_host_concurrency: int = 4
+    rate_limit_rps: float = 1.0
+    rate_limit_burst: int = 2
+    rate_limit_min_rps: float = 0.1
+    rate_limit_max_rps: float = 4.0
+    latency_target: float = 2.0
+    rate_limit_decrease_cooldown: float = 2.0
+    rate_limit_recovery_seconds: float = 30.0
+    pool_size: int = 10
+    max_page: int = 1
+    parser_backend: str = "bs4"
+    detail_container_id: Optional[str] = "details_container"
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 1.0
+    retry_max_delay: float = 30.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+    rescrape_default_ttl_hours: float = 168
+    rescrape_field_ttl_hours: dict[str, float] = field(default_factory=lambda: {
+        "openings": 48, "stipend": 72
+    })
+    rescrape_apply_by_horizon_days: float = 0
+    rescrape_max_per_run: int = 500
+    cassette_mode: Optional[str] = None
+    cassette_path: Optional[str] = None
+    profile_enabled: bool = False
+    profile_sample_interval: float = 0.005
 
     @classmethod
     def from_dict(cls, config_data: dict[str, Any]) -> "ScraperConfig":
@@ -40,6 +68,32 @@ class ScraperConfig:
             base_urls=config_data.get("baseUrl", {"internshala": "https://internshala.com"}),
             headers=config_data.get("headers", {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}),
             experience_years=config_data.get("experience_years", 0),
+            max_concurrency=config_data.get("max_concurrency", 8),
+            per_host_concurrency=config_data.get("per_host_concurrency", 4),
+            rate_limit_rps=config_data.get("rate_limit_rps", 1.0),
+            rate_limit_burst=config_data.get("rate_limit_burst", 2),
+            rate_limit_min_rps=config_data.get("rate_limit_min_rps", 0.1),
+            rate_limit_max_rps=config_data.get("rate_limit_max_rps", 4.0),
+            latency_target=config_data.get("latency_target", 2.0),
+            rate_limit_decrease_cooldown=config_data.get("rate_limit_decrease_cooldown", 2.0),
+            rate_limit_recovery_seconds=config_data.get("rate_limit_recovery_seconds", 30.0),
+            pool_size=config_data.get("pool_size", 10),
+            max_page=config_data.get("max_page", 1),
+            parser_backend=config_data.get("parser_backend", "bs4"),
+            detail_container_id=config_data.get("detail_container_id", "details_container"),
+            retry_max_attempts=config_data.get("retry_max_attempts", 3),
+            retry_base_delay=config_data.get("retry_base_delay", 1.0),
+            retry_max_delay=config_data.get("retry_max_delay", 30.0),
+            breaker_failure_threshold=config_data.get("breaker_failure_threshold", 5),
+            breaker_reset_timeout=config_data.get("breaker_reset_timeout", 30.0),
+            rescrape_default_ttl_hours=config_data.get("rescrape_default_ttl_hours", 168),
+            rescrape_field_ttl_hours=config_data.get("rescrape_field_ttl_hours", {"openings": 48, "stipend": 72}),
+            rescrape_apply_by_horizon_days=config_data.get("rescrape_apply_by_horizon_days", 0),
+            rescrape_max_per_run=config_data.get("rescrape_max_per_run", 500),
+            cassette_mode=config_data.get("cassette_mode"),
+            cassette_path=config_data.get("cassette_path"),
+            profile_enabled=config_data.get("profile_enabled", False),
+            profile_sample_interval=config_data.get("profile_sample_interval", 0.005),
         )
 
     @classmethod
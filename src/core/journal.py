@@ -0,0 +1,120 @@
+import os
+import json
+from dataclasses import asdict
+from typing import Iterable, Iterator
+from src.constants import Constants
+from src.core.exception import CustomException
+from src.core.logger import scraper_logger as logger, sanitize
+from src.core.models import JobDetails
+from src.core.rescrape import utc_now_iso
+
+PENDING, DONE, FAILED = "pending", "done", "failed"
+
+
+class ScrapeJournal:
+    """
+    Append-only JSONL progress journal of one scrape run, so a killed or retried
+    run only redoes what is left.
+
+    One line per event: {"url", "status": pending|done|failed, "ts", "job"?, "error"?}.
+    The last event of a URL wins; `done` lines carry the scraped job so a resumed
+    scrape() can return the full result set. A torn last line (crash mid-write) is ignored.
+
+    Args:
+        run_id (str): Run identifier (e.g. the Airflow run id), one file per run.
+        path (str, optional): Journal file, defaults to `Constants.journals_dir/<run_id>.jsonl`.
+
+    Usage:
+        with ScrapeJournal(run_id) as journal:
+            jobs = scraper.scrape(urls, journal=journal)
+    """
+    def __init__(self, run_id: str, path: str | None = None):
+        if not run_id:
+            raise CustomException("ScrapeJournal needs a run_id.")
+        self.run_id = run_id
+        self.path = path or os.path.join(Constants.journals_dir, f"{sanitize(run_id)}.jsonl")
+        self.status: dict[str, str] = {}
+        self.jobs: dict[str, dict] = {}
+        self._file = None
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    event = json.loads(line)
+                    url, status = event["url"], event["status"]
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("Journal %s: skipping unreadable line %s", self.path, line_no)
+                    continue
+                self.status[url] = status
+                if status == DONE and event.get("job") is not None:
+                    self.jobs[url] = event["job"]
+                else:
+                    self.jobs.pop(url, None)
+        if self.status:
+            logger.info("Resuming run '%s' from journal: %s", self.run_id, self.summary())
+
+    def _append(self, url: str, status: str, **extra):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            torn = False
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            # line buffered, every event reaches the OS as soon as it is written
+            self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            if torn:
+                # terminate the torn last line so the next event stays readable
+                self._file.write("\n")
+        self._file.write(json.dumps({"url": url, "status": status, "ts": utc_now_iso(), **extra}) + "\n")
+        self.status[url] = status
+
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def mark_pending(self, urls: Iterable[str]):
+        """ Record the URLs a run intends to scrape (already known ones are left as they are)."""
+        for url in urls:
+            if url not in self.status:
+                self._append(url, PENDING)
+
+    def mark_done(self, url: str, job: JobDetails | None = None):
+        job_dict = asdict(job) if job is not None else None
+        self._append(url, DONE, job=job_dict)
+        if job_dict is not None:
+            self.jobs[url] = job_dict
+
+    def mark_failed(self, url: str, error: str):
+        self._append(url, FAILED, error=error)
+        self.jobs.pop(url, None)
+
+    def is_done(self, url: str) -> bool:
+        return self.status.get(url) == DONE
+
+    def remaining(self, urls: Iterable[str]) -> Iterator[str]:
+        """ URLs not done yet, pending and failed ones are retried."""
+        return (url for url in urls if not self.is_done(url))
+
+    def done_jobs(self) -> list[JobDetails]:
+        """ Jobs scraped by earlier attempts of this run."""
+        return [JobDetails(**job) for job in self.jobs.values()]
+
+    def summary(self) -> dict:
+        counts = {PENDING: 0, DONE: 0, FAILED: 0}
+        for status in self.status.values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
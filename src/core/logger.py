@@ -1,13 +1,28 @@
 import os
 import re
+import json
+import time
+import queue
+import atexit
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from src.constants import Constants
 
 # Cache for per-session logs path (non-Airflow default)
 _session_logs_path = None
 
+# Backend settings, read from the environment when a logger is first used (configure() overrides them):
+#   LOG_QUEUE=1           format and write records on a background listener thread
+#   LOG_JSON=1            one JSON object per line instead of the text format
+#   LOG_RATE_LIMIT=20/60  at most 20 lines per message template every 60 seconds, 0 disables
+#                         (warnings and errors are never dropped)
+_overrides: dict = {}
+# Running queue listeners with the handler feeding each, stopped (and drained) at exit
+_listeners: list[tuple[QueueListener, QueueHandler]] = []
+
 # --- Helpers ---
 
 def sanitize(name: str) -> str:
@@ -70,6 +85,85 @@ class SimpleContextFormatter(logging.Formatter):
             )
         return super().format(record)
 
+class JsonFormatter(SimpleContextFormatter):
+    """
+    One JSON object per record: ts, level, context, line, message (and exc when set).
+    """
+    def format(self, record):
+        super().format(record)  # fills message, app_context and exc_text
+        entry = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "context": record.app_context,
+            "line": record.lineno,
+            "message": record.message,
+        }
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+class RateLimitFilter(logging.Filter):
+    """
+    Per-message rate limit: at most `burst` records of the same level and message
+    template (the unformatted `msg`, so %-style calls with different arguments count
+    as one message) every `interval` seconds. The first record let through after a
+    suppression notes how many were dropped. Records at `pass_level` or above
+    (warnings and errors by default) always go through, e.g. per-URL failures.
+
+    Windows are kept for at most `max_keys` templates, least recently logged first
+    out, and expired ones are swept every `interval`, so messages built with
+    f-strings (one template each) can't grow it without bound.
+    """
+    def __init__(self, burst: int, interval: float, max_keys: int = 1024, pass_level: int = logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_keys = max_keys
+        self.pass_level = pass_level
+        self._windows: OrderedDict[tuple, list] = OrderedDict()  # key -> [window start, count, suppressed]
+        self._swept = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float):
+        if now - self._swept >= self.interval:
+            self._swept = now
+            for key in [key for key, window in self._windows.items()
+                        if now - window[0] >= self.interval and not window[2]]:
+                del self._windows[key]
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+
+    def filter(self, record):
+        if record.levelno >= self.pass_level:
+            return True
+        key = (record.levelno, record.msg if isinstance(record.msg, str) else id(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is not None:
+                self._windows.move_to_end(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                self._evict(now)
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.msg = f"{record.msg} [{suppressed} similar messages suppressed]"
+        return True
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue records as they are, the listener thread formats them
+    (QueueHandler.prepare would format on the calling thread).
+    """
+    def prepare(self, record):
+        return record
+
 class FileFilter(logging.Filter):
     def filter(self, record):
         return record.levelno >= logging.INFO
@@ -80,7 +174,73 @@ class ConsoleFilter(logging.Filter):
 
 # --- Lazy Logger ---
 
+def configure(queue: bool | None = None, json: bool | None = None, rate_limit: str | None = None):
+    """
+    Override the LOG_QUEUE / LOG_JSON / LOG_RATE_LIMIT settings.
+    Applies to loggers not used yet, call it before the first log line.
+    """
+    for name, value in (("queue", queue), ("json", json), ("rate_limit", rate_limit)):
+        if value is not None:
+            _overrides[name] = value
+
+def _setting(name: str):
+    if name in _overrides:
+        return _overrides[name]
+    if name == "rate_limit":
+        return os.getenv("LOG_RATE_LIMIT", "0")
+    return os.getenv(f"LOG_{name.upper()}", "0").lower() in ("1", "true", "yes")
+
+def _parse_rate_limit(value) -> tuple[int, float] | None:
+    """ "20/60" -> (20, 60.0), None when off or malformed."""
+    try:
+        burst, _, interval = str(value).partition("/")
+        burst, interval = int(burst), float(interval or 60)
+    except ValueError:
+        return None
+    return (burst, interval) if burst > 0 and interval > 0 else None
+
+def _stop_listeners():
+    while _listeners:
+        listener, _ = _listeners.pop()
+        listener.stop()
+
+_flush_lock = threading.Lock()
+
+def flush():
+    """
+    Write every queued record now (queue mode). Call it where a process may end
+    without running atexit, e.g. at the end of an Airflow task: forked task runners
+    leave with os._exit() and would drop the tail of the queue.
+    """
+    with _flush_lock:
+        for listener, _ in _listeners:
+            listener.stop()  # drains the queue up to the stop sentinel
+            listener.start()
+
+def _restart_listeners():
+    """
+    Listener threads don't survive fork() (e.g. Airflow task runners): give the child
+    fresh queues and listeners, records queued before the fork are the parent's to write.
+    """
+    for i, (listener, queue_handler) in enumerate(_listeners):
+        queue_handler.queue = queue.SimpleQueue()
+        child_listener = QueueListener(queue_handler.queue, *listener.handlers, respect_handler_level=True)
+        child_listener.start()
+        _listeners[i] = (child_listener, queue_handler)
+
+atexit.register(_stop_listeners)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listeners)
+
 class LazyLogger:
+    """
+    Component logger, the handlers are created on first use.
+
+    Messages take lazy %-style arguments (`logger.info("got %s", url)`), which are
+    only formatted once a handler writes the record. In queue mode (LOG_QUEUE=1)
+    that formatting and the file / console I/O run on a background listener thread,
+    the calling thread only builds the record and enqueues it.
+    """
     def __init__(self, logger_name: str, use_ctx: bool = False):
         self.logger_name = logger_name
         self._logger = None
@@ -92,14 +252,17 @@ class LazyLogger:
             file_path = os.path.join(logs_path, f"{self.logger_name}.log")
 
             logger = logging.getLogger(f"job_generator.{self.logger_name}")
-            logger.setLevel(logging.DEBUG)
+            # handlers write INFO and up, below that no record is built at all
+            logger.setLevel(logging.INFO)
             logger.propagate = False
 
             if not logger.handlers:
-                formatter = SimpleContextFormatter(
+                formatter_cls = JsonFormatter if _setting("json") else SimpleContextFormatter
+                formatter = formatter_cls(
                     fmt='[%(asctime)s] %(app_context)s:%(lineno)d - %(levelname)s - %(message)s',
                     datefmt='%Y-%m-%d %H:%M:%S'
                 )
+                handlers = []
 
                 # File handler
                 try:
@@ -109,7 +272,7 @@ class LazyLogger:
                     file_handler.setLevel(logging.INFO)
                     file_handler.setFormatter(formatter)
                     file_handler.addFilter(FileFilter())
-                    logger.addHandler(file_handler)
+                    handlers.append(file_handler)
                 except Exception:
                     # Fall back to console if file handler fails
                     pass
@@ -119,47 +282,57 @@ class LazyLogger:
                 console_handler.setLevel(logging.INFO)
                 console_handler.setFormatter(formatter)
                 console_handler.addFilter(ConsoleFilter())
-                logger.addHandler(console_handler)
+                handlers.append(console_handler)
+
+                # Repetitive lines are dropped before they are queued or formatted
+                rate_limit = _parse_rate_limit(_setting("rate_limit"))
+                if rate_limit is not None:
+                    logger.addFilter(RateLimitFilter(*rate_limit))
+
+                if _setting("queue"):
+                    records = queue.SimpleQueue()
+                    listener = QueueListener(records, *handlers, respect_handler_level=True)
+                    listener.start()
+                    queue_handler = _DeferredQueueHandler(records)
+                    _listeners.append((listener, queue_handler))
+                    queue_handler.setLevel(logging.INFO)
+                    logger.addHandler(queue_handler)
+                else:
+                    for handler in handlers:
+                        logger.addHandler(handler)
 
             self._logger = logger
         return self._logger
 
-    # Proxy methods with optional ctx=...; sets stacklevel so lineno points to caller
+    def _log(self, level, msg, args, ctx, kwargs):
+        logger = self._initialize_logger()
+        if not logger.isEnabledFor(level):
+            return
+        kwargs.setdefault("stacklevel", 3)  # lineno of the caller of info(), warning(), ...
+        extra = kwargs.pop("extra", None)
+        app_context = f"DAG-> {ctx[1]} - TASK-> {ctx[2]}" if (self._use_ctx and ctx is not None) else None
+        extra = {**extra, "app_context": app_context} if extra else {"app_context": app_context}
+        logger.log(level, msg, *args, extra=extra, **kwargs)
+
+    # Proxy methods with optional ctx=...; stacklevel makes lineno point to the caller
     def debug(self, msg, *args, ctx=None, **kwargs):
-        kwargs.setdefault("stacklevel", 2)
-        extra = kwargs.pop("extra", {})
-        extra["app_context"] = f"DAG-> {ctx[1]} - TASK-> {ctx[2]}" if (self._use_ctx and ctx is not None) else None
-        self._initialize_logger().debug(msg, *args, extra=extra, **kwargs)
+        self._log(logging.DEBUG, msg, args, ctx, kwargs)
 
     def info(self, msg, *args, ctx=None, **kwargs):
-        kwargs.setdefault("stacklevel", 2)
-        extra = kwargs.pop("extra", {})
-        extra["app_context"] = f"DAG-> {ctx[1]} - TASK-> {ctx[2]}" if (self._use_ctx and ctx is not None) else None
-        self._initialize_logger().info(msg, *args, extra=extra, **kwargs)
+        self._log(logging.INFO, msg, args, ctx, kwargs)
 
     def warning(self, msg, *args, ctx=None, **kwargs):
-        kwargs.setdefault("stacklevel", 2)
-        extra = kwargs.pop("extra", {})
-        extra["app_context"] = f"DAG-> {ctx[1]} - TASK-> {ctx[2]}" if (self._use_ctx and ctx is not None) else None
-        self._initialize_logger().warning(msg, *args, extra=extra, **kwargs)
+        self._log(logging.WARNING, msg, args, ctx, kwargs)
 
     def error(self, msg, *args, ctx=None, **kwargs):
-        kwargs.setdefault("stacklevel", 2)
-        extra = kwargs.pop("extra", {})
-        extra["app_context"] = f"DAG-> {ctx[1]} - TASK-> {ctx[2]}" if (self._use_ctx and ctx is not None) else None
-        self._initialize_logger().error(msg, *args, extra=extra, **kwargs)
+        self._log(logging.ERROR, msg, args, ctx, kwargs)
 
     def critical(self, msg, *args, ctx=None, **kwargs):
-        kwargs.setdefault("stacklevel", 2)
-        extra = kwargs.pop("extra", {})
-        extra["app_context"] = f"DAG-> {ctx[1]} - TASK-> {ctx[2]}" if (self._use_ctx and ctx is not None) else None
-        self._initialize_logger().critical(msg, *args, extra=extra, **kwargs)
+        self._log(logging.CRITICAL, msg, args, ctx, kwargs)
 
     def exception(self, msg, *args, ctx=None, **kwargs):
-        kwargs.setdefault("stacklevel", 2)
-        extra = kwargs.pop("extra", {})
-        extra["app_context"] = f"DAG-> {ctx[1]} - TASK-> {ctx[2]}" if (self._use_ctx and ctx is not None) else None
-        self._initialize_logger().exception(msg, *args, extra=extra, **kwargs)
+        kwargs.setdefault("exc_info", True)
+        self._log(logging.ERROR, msg, args, ctx, kwargs)
 
 # --- Predefined Component Loggers ---
 
@@ -167,7 +340,7 @@ scraper_logger = LazyLogger('scraper')
 db_logger = LazyLogger('db')
 airflow_logger = LazyLogger('airflow', use_ctx=True)
 
-__all__ = ["scraper_logger", "db_logger", "airflow_logger"]
+__all__ = ["scraper_logger", "db_logger", "airflow_logger", "flush"]
 
 
 # --- CLI Test ---
@@ -0,0 +1,210 @@
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from src.constants import Constants
+from src.core.logger import sanitize
+
+# Latency buckets (seconds) of every histogram, +Inf is implied
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Hot-path metric names, one histogram per pipeline stage
+FETCH_SECONDS = "scraper_fetch_seconds"            # HTTP round trip, labels: source, status
+WAIT_SECONDS = "scraper_wait_seconds"              # time not fetching, labels: source, reason (rate_limit|retry|breaker)
+PARSE_SECONDS = "scraper_parse_seconds"            # HTML -> tree, labels: source, page (detail|listing)
+EXTRACT_SECONDS = "scraper_extract_seconds"        # tree -> JobDetails fields, labels: source
+DEDUP_SECONDS = "db_dedup_seconds"                 # "already stored?" lookups, labels: backend (bloom|mongo)
+WRITE_SECONDS = "db_write_seconds"                 # Mongo bulk writes, labels: collection
+FETCH_ERRORS = "scraper_fetch_errors_total"        # failed attempts, labels: source, error
+WRITE_DOCS = "db_write_docs_total"                 # documents written, labels: collection
+
+
+def _key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process counters and latency histograms.
+
+    Every series carries the registry's default labels (e.g. `task`) plus its own
+    (e.g. `source`, `status`). Export with render() (Prometheus text format),
+    write() (node_exporter textfile collector) or serve() (local /metrics endpoint).
+
+    Usage:
+        with metrics.timer(PARSE_SECONDS, source="internshala", page="detail"):
+            root = parser.parse(content)
+        metrics.inc(WRITE_DOCS, len(docs), collection="job_details")
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, _Histogram]] = {}
+        self.default_labels: dict[str, str] = {}
+
+    def reset(self, **default_labels):
+        """ Drop every series and set new default labels (start of a task)."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.default_labels = {k: str(v) for k, v in default_labels.items() if v is not None}
+
+    def set_labels(self, **labels):
+        """ Add default labels to series recorded from now on (e.g. the shard, once known)."""
+        with self._lock:
+            self.default_labels.update({k: str(v) for k, v in labels.items() if v is not None})
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _key({**self.default_labels, **labels})
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _key({**self.default_labels, **labels})
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """ Observe the duration of the block, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self) -> str:
+        """ All series in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._histograms):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.total:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | None = None) -> str:
+        """
+        Write render() atomically (node_exporter textfile collector picks it up).
+        Args:
+            path (str, optional): Defaults to `Constants.metrics_dir/<task>[-<label>-<value>...].prom`.
+        Returns:
+            str: The file written.
+        """
+        if path is None:
+            labels = dict(self.default_labels)
+            name = "-".join([labels.pop("task", "scraper")] + [f"{k}-{v}" for k, v in sorted(labels.items())])
+            path = os.path.join(Constants.metrics_dir, f"{sanitize(name)}.prom")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+        return path
+
+    def summary(self) -> dict:
+        """
+        Per-stage totals across labels, for a log line at the end of a task:
+        {histogram: {"count", "total_s", "mean_ms", "max_ms"}, counter: total}.
+        """
+        result = {}
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                count = sum(h.count for h in series.values())
+                total = sum(h.total for h in series.values())
+                result[name] = {
+                    "count": count,
+                    "total_s": round(total, 3),
+                    "mean_ms": round(total / count * 1000, 2) if count else 0.0,
+                    "max_ms": round(max(h.max for h in series.values()) * 1000, 2),
+                }
+            for name, series in sorted(self._counters.items()):
+                result[name] = sum(series.values())
+        return result
+
+    def serve(self, port: int = 9108, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """ Serve render() at http://host:port/metrics from a daemon thread. Stop with .shutdown()."""
+        registry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode()
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-endpoint", daemon=True).start()
+        return server
+
+
+# Process-wide registry the hot paths report to
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def task_metrics(task: str | None, path: str | None = None, **labels) -> Iterator[MetricsRegistry]:
+    """
+    Scope the process registry to one task: reset it with `task` (and `labels`)
+    as default labels, and write the Prometheus file when the task ends, failed or not.
+
+    Usage:
+        with task_metrics(task_id) as registry:
+            ...
+            logger.info("Stage metrics: %s", registry.summary())
+    """
+    metrics.reset(task=task, **labels)
+    try:
+        yield metrics
+    finally:
+        metrics.write(path)
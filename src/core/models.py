@@ -19,3 +19,5 @@ class JobDetails:
     posted_date: Optional[str] = None
     company_url: Optional[str] = None
     url: Optional[str] = None
+    fingerprint: Optional[str] = None  # hash of the page's detail container
+    last_checked: Optional[str] = None  # UTC ISO time the page was last fetched
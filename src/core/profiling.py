@@ -0,0 +1,151 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import functools
+import threading
+import inspect
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+from src.core.config import ScraperConfig
+from src.core.logger import scraper_logger as logger, get_session_logs_path, sanitize
+
+# PROFILE=1 turns profiling on (PROFILE=0 off) whatever the config says
+PROFILE_ENV = "PROFILE"
+# a single profile per process, nested profiled calls (a task's scraper.scrape) run unprofiled
+_active = threading.Lock()
+
+
+def profiling_enabled(cfg: ScraperConfig | None = None) -> bool:
+    """ `PROFILE` env var if set, else `cfg.profile_enabled`."""
+    env = os.getenv(PROFILE_ENV)
+    if env is not None and env.strip():
+        return env.strip().lower() in ("1", "true", "yes")
+    return bool(cfg is not None and cfg.profile_enabled)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler: a daemon thread reads the stack of every other
+    thread each `interval` seconds and counts the collapsed stacks, so time spent
+    in worker threads and waiting on the network shows up too (cProfile only sees
+    the thread that started it).
+
+    Args:
+        interval (float): Seconds between samples.
+    """
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_folded(self, path: str):
+        """ Collapsed stacks, one `root;...;leaf count` line each (flamegraph.pl, speedscope, inferno)."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile(name: str,
+            context_str: str | None = None,
+            enabled: bool | None = None,
+            interval: float = 0.005) -> Iterator[str | None]:
+    """
+    Profile the block into the session logs folder (`get_session_logs_path(context_str)`):
+        <name>-<time>-<pid>.prof     cProfile stats of the calling thread (snakeviz, pstats)
+        <name>-<time>-<pid>.folded   sampled collapsed stacks of all threads (flamegraph)
+    Does nothing when profiling is off or another profile is already running.
+    Args:
+        name (str): Task or method name, prefix of the files.
+        context_str (str, optional): Log subfolder, e.g. the Airflow run id.
+        enabled (bool, optional): Defaults to profiling_enabled().
+        interval (float, optional): Stack sampling period in seconds.
+    Yields:
+        str | None: The files' path prefix, None when not profiling.
+    """
+    if enabled is None:
+        enabled = profiling_enabled()
+    if not enabled or not _active.acquire(blocking=False):
+        yield None
+        return
+
+    prefix = os.path.join(
+        get_session_logs_path(context_str),
+        sanitize(f"{name}-{datetime.now().strftime('%H%M%S')}-{os.getpid()}")
+    )
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval)
+    start = time.perf_counter()
+    try:
+        sampler.start()
+        profiler.enable()
+        try:
+            yield prefix
+        finally:
+            profiler.disable()
+            sampler.stop()
+            elapsed = time.perf_counter() - start
+            try:
+                profiler.dump_stats(f"{prefix}.prof")
+                sampler.write_folded(f"{prefix}.folded")
+                top = pstats.Stats(profiler).sort_stats(pstats.SortKey.TIME)
+                hot = [f"{pstats.func_std_string(func)} {top.stats[func][2]:.3f}s" for func in top.fcn_list[:5]]
+                logger.info("Profiled %s in %.2fs, %d samples -> %s.{prof,folded} | top self time: %s",
+                            name, elapsed, sampler.samples, prefix, hot)
+            except OSError as e:
+                logger.warning("Could not write profile of %s to %s: %s", name, prefix, e)
+    finally:
+        _active.release()
+
+
+def profiled(func):
+    """
+    Profile a scraper method when its `self.cfg` (or the PROFILE env var) enables it.
+    Works on plain and async methods.
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            with profile(func.__name__, enabled=profiling_enabled(self.cfg),
+                         interval=self.cfg.profile_sample_interval):
+                return await func(self, *args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with profile(func.__name__, enabled=profiling_enabled(self.cfg),
+                     interval=self.cfg.profile_sample_interval):
+            return func(self, *args, **kwargs)
+    return wrapper
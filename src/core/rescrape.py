@@ -0,0 +1,123 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+from src.core.config import ScraperConfig
+
+
+def utc_now_iso() -> str:
+    """ Current UTC time as an ISO string, the format of JobDetails.last_checked."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _parse_apply_by(text: str | None) -> datetime | None:
+    """ Internshala apply-by label, e.g. "19 Nov' 26", as a UTC datetime (None if unparsable)."""
+    if not text:
+        return None
+    try:
+        return datetime.strptime(text.strip(), "%d %b' %y").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _parse_checked(text: str | None) -> datetime | None:
+    if not text:
+        return None
+    try:
+        checked = datetime.fromisoformat(text)
+    except (TypeError, ValueError):
+        return None
+    return checked if checked.tzinfo else checked.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class RescrapePolicy:
+    """
+    Decides which stored jobs are worth fetching again.
+
+    A stored value is trusted for the TTL of its field; a job is due once the
+    shortest TTL among its non-empty fields (or `default_ttl_hours`) has passed
+    since `last_checked`. Jobs whose apply-by date is more than
+    `apply_by_horizon_days` in the past, or whose page is gone (`removed`, set
+    when it answered 404), are closed and never re-scraped; select() reports the
+    former so the caller can flag them `closed` and query() stops streaming them.
+
+    A job without `last_checked` (stored before re-scraping existed) counts as
+    just checked, the filter task backfills the field so it starts aging.
+    At most `max_per_run` due jobs are selected per run, the rest are due next run.
+
+    Args:
+        default_ttl_hours (float): TTL of a job none of whose fields has its own.
+        field_ttl_hours (dict): JobDetails field -> TTL in hours, e.g. {"stipend": 72}.
+        apply_by_horizon_days (float): Keep checking this many days past apply-by.
+        max_per_run (int): Cap on the jobs select() yields, 0 for no cap.
+    """
+    default_ttl_hours: float = 168
+    field_ttl_hours: dict[str, float] = field(default_factory=dict)
+    apply_by_horizon_days: float = 0
+    max_per_run: int = 500
+
+    @classmethod
+    def from_config(cls, cfg: ScraperConfig) -> "RescrapePolicy":
+        return cls(
+            default_ttl_hours= cfg.rescrape_default_ttl_hours,
+            field_ttl_hours= dict(cfg.rescrape_field_ttl_hours),
+            apply_by_horizon_days= cfg.rescrape_apply_by_horizon_days,
+            max_per_run= cfg.rescrape_max_per_run,
+        )
+
+    @property
+    def projection(self) -> dict:
+        """ Mongo projection with every field the policy reads."""
+        keys = {"url", "fingerprint", "last_checked", "apply_by", "removed", "closed", *self.field_ttl_hours}
+        return {key: 1 for key in keys}
+
+    def query(self, now: datetime | None = None) -> dict:
+        """
+        Mongo filter narrowing the scan to jobs that may be due: not removed or closed, and
+        checked at least the shortest TTL ago (ISO UTC strings compare in time order).
+        """
+        now = now or datetime.now(timezone.utc)
+        shortest = min(self.field_ttl_hours.values(), default=self.default_ttl_hours)
+        shortest = min(shortest, self.default_ttl_hours)
+        checked_before = (now - timedelta(hours=shortest)).isoformat(timespec="seconds")
+        return {"removed": {"$ne": True}, "closed": {"$ne": True}, "last_checked": {"$lte": checked_before}}
+
+    def ttl(self, doc: dict) -> timedelta:
+        hours = [ttl for name, ttl in self.field_ttl_hours.items() if doc.get(name) not in (None, "")]
+        return timedelta(hours=min(hours, default=self.default_ttl_hours))
+
+    def closed(self, doc: dict, now: datetime) -> bool:
+        if doc.get("removed") or doc.get("closed"):
+            return True
+        apply_by = _parse_apply_by(doc.get("apply_by"))
+        # apply-by is a day, the listing stays open until its end
+        return apply_by is not None and now > apply_by + timedelta(days=1 + self.apply_by_horizon_days)
+
+    def due(self, doc: dict, now: datetime | None = None) -> bool:
+        """ Whether a stored job should be fetched again."""
+        now = now or datetime.now(timezone.utc)
+        if self.closed(doc, now):
+            return False
+        checked = _parse_checked(doc.get("last_checked"))
+        return checked is not None and now - checked >= self.ttl(doc)
+
+    def select(self,
+               docs: Iterable[dict],
+               now: datetime | None = None,
+               on_closed: Callable[[dict], None] | None = None) -> Iterator[dict]:
+        """
+        Lazily filter stored docs down to the due ones, at most `max_per_run`.
+        `on_closed` is called with each closed doc met on the way, to flag it `closed`.
+        """
+        now = now or datetime.now(timezone.utc)
+
+        def _due(doc: dict) -> bool:
+            if self.closed(doc, now):
+                if on_closed is not None:
+                    on_closed(doc)
+                return False
+            return self.due(doc, now)
+
+        due = (doc for doc in docs if _due(doc))
+        return islice(due, self.max_per_run if self.max_per_run > 0 else None)
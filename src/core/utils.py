@@ -98,7 +98,7 @@ def save_to_csv(results:list[JobDetails]) -> str | None:
             fieldnames = ['title', 'company', 'location', 'start_date', 'duration', 
                          'stipend', 'apply_by', 'responsibilities', 'skills_required', 
                          'other_requirements', 'perks', 'openings', 'company_description', 
-                         'posted_date','company_url', 'url']
+                         'posted_date','company_url', 'url', 'fingerprint', 'last_checked']
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
             for job in results:
@@ -107,7 +107,7 @@ def save_to_csv(results:list[JobDetails]) -> str | None:
                     if isinstance(value, list):
                         job_dict[key] = ', '.join(value)
                 writer.writerow(job_dict)
-        logger.info(f"Successfully saved {len(results)} jobs to jobs.csv")
+        logger.info("Successfully saved %s jobs to jobs.csv", len(results))
         return file_path
     except Exception:
         logger.exception("Error saving to CSV")
@@ -139,12 +139,14 @@ def load_csv(
                     company_description=row['company_description'],
                     posted_date=row['posted_date'],
                     company_url=row['company_url'],
-                    url=row['url']
+                    url=row['url'],
+                    fingerprint=row.get('fingerprint'),
+                    last_checked=row.get('last_checked')
                 )
                 job_list.append(job_details)
         return job_list
     except Exception:
-        logger.exception(f"Error loading CSV from {path}")
+        logger.exception("Error loading CSV from %s", path)
         return None
     
 
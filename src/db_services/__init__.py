@@ -5,14 +5,31 @@ This module contains Python clients for all database operations in the project.
 Modules:
     mongo_service.py:
         - Provides temporary storage before data enrichment
-        - Methods: connect(), select(), insert()
+        - Methods: connect(), select(), insert(), upsert_many(), bulk_write(), touch_many(), find(), iter_find(), existing_ids()
+    mongo_sink.py:
+        - MongoBufferedSink, micro-batched writer flushing every N docs or T seconds
+    seen_index.py:
+        - SeenUrlIndex, persistent mmap Bloom filter of stored ids in front of Mongo
+    redis_queue.py:
+        - RedisWorkQueue, distributed URL queue with leases, acks and requeue of expired leases
+    dead_letters.py:
+        - DeadLetterStore (JSONL) / MongoDeadLetterStore, failed URLs with error details, for replay
 
 Usage:
     from src.db_services.mongo_service import connect, select, insert
 """
 
 from .mongo_service import MongoDBService as MongoClient
+from .mongo_sink import MongoBufferedSink
+from .seen_index import SeenUrlIndex
+from .redis_queue import RedisWorkQueue
+from .dead_letters import DeadLetterStore, MongoDeadLetterStore
 
 __all__ = [
-    "MongoClient"
+    "MongoClient",
+    "MongoBufferedSink",
+    "SeenUrlIndex",
+    "RedisWorkQueue",
+    "DeadLetterStore",
+    "MongoDeadLetterStore"
 ]
\ No newline at end of file
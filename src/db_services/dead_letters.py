@@ -0,0 +1,135 @@
+import os
+import json
+import threading
+from typing import Iterable
+from pymongo import UpdateOne, DeleteOne
+from src.constants import Constants
+from src.core.exception import CustomException
+from src.core.logger import db_logger as logger
+from src.core.rescrape import utc_now_iso
+from .mongo_service import MongoDBService
+
+
+def dead_letter(url: str, error: Exception, run_id: str | None = None) -> dict:
+    """
+    Dead-letter entry for a URL that failed: error class, HTTP status and attempt
+    count (when the error is a FetchError), message, time and run id.
+    """
+    cause = error.__cause__ if isinstance(error, CustomException) and error.__cause__ is not None else error
+    return {
+        "url": url,
+        "error_class": getattr(error, "error_class", None) or type(cause).__name__,
+        "status": getattr(error, "status", None),
+        "attempts": getattr(error, "attempts", 1),
+        "message": str(error.args[0]) if error.args else str(error),
+        "failed_at": utc_now_iso(),
+        "run_id": run_id,
+    }
+
+
+class DeadLetterStore:
+    """
+    Append-only JSONL dead-letter file: one line per failure or resolution,
+    the last event of a URL wins. For a single worker / local runs, see
+    MongoDeadLetterStore for one shared by Airflow workers.
+
+    Args:
+        path (str): JSONL file, defaults to `Constants.dead_letters_path`.
+        run_id (str, optional): Stored with every failure.
+
+    Usage:
+        store = DeadLetterStore()
+        jobs = scraper.scrape(urls, on_error=store.record)
+        replayed = list(scraper.iter_replay(store))
+    """
+    def __init__(self, path: str = Constants.dead_letters_path, run_id: str | None = None):
+        self.path = path
+        self.run_id = run_id
+        self._lock = threading.Lock()
+
+    def _append(self, events: list[dict]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+
+    def record(self, url: str, error: Exception):
+        """ Dead-letter a failed URL (usable as the scraper's `on_error`)."""
+        entry = dead_letter(url, error, self.run_id)
+        self._append([entry])
+        logger.warning("Dead-lettered %s: %s status=%s attempts=%s", url, entry['error_class'], entry['status'], entry['attempts'])
+
+    def resolve(self, urls: Iterable[str]):
+        """ Drop URLs that were replayed successfully."""
+        self._append([{"url": url, "resolved_at": utc_now_iso()} for url in urls])
+
+    def __len__(self) -> int:
+        return len(self.entries())
+
+    def entries(self, limit: int = 0, exclude_run_id: str | None = None) -> list[dict]:
+        """
+        Unresolved dead letters, oldest failure first, each with its failure `count`.
+        Args:
+            limit (int): Max entries (0 = all).
+            exclude_run_id (str, optional): Skip URLs whose last failure is from this run.
+        """
+        current: dict[str, dict] = {}
+        if os.path.exists(self.path):
+            with self._lock, open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                        url = event["url"]
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if "resolved_at" in event:
+                        current.pop(url, None)
+                    else:
+                        event["count"] = current.get(url, {}).get("count", 0) + 1
+                        current.pop(url, None)
+                        current[url] = event
+        entries = [entry for entry in current.values() if exclude_run_id is None or entry.get("run_id") != exclude_run_id]
+        return entries[:limit] if limit > 0 else entries
+
+    def compact(self) -> int:
+        """ Rewrite the file with only the unresolved entries. Returns how many are left."""
+        entries = self.entries()
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(tmp_path, self.path)
+        return len(entries)
+
+
+class MongoDeadLetterStore:
+    """
+    Dead letters in a Mongo collection, one document per URL (`_id` = url) with
+    the last error and a failure `count`. Same API as DeadLetterStore.
+
+    Args:
+        db (MongoDBService): Service bound to the dead-letter collection.
+        run_id (str, optional): Stored with every failure.
+    """
+    def __init__(self, db: MongoDBService, run_id: str | None = None):
+        self.db = db
+        self.run_id = run_id
+
+    def record(self, url: str, error: Exception):
+        entry = dead_letter(url, error, self.run_id)
+        self.db.bulk_write([UpdateOne({"_id": url}, {"$set": entry, "$inc": {"count": 1}}, upsert=True)])
+        logger.warning("[task=%s] Dead-lettered %s: %s status=%s attempts=%s",
+                       self.db.task_id, url, entry['error_class'], entry['status'], entry['attempts'])
+
+    def resolve(self, urls: Iterable[str]):
+        operations = [DeleteOne({"_id": url}) for url in dict.fromkeys(urls)]
+        if operations:
+            self.db.bulk_write(operations)
+
+    def __len__(self) -> int:
+        return self.db.count()
+
+    def entries(self, limit: int = 0, exclude_run_id: str | None = None) -> list[dict]:
+        filter_query = {"run_id": {"$ne": exclude_run_id}} if exclude_run_id is not None else None
+        return list(self.db.iter_find(filter_query, sort=[("failed_at", 1)], row_limit=limit, stringify_id=False))
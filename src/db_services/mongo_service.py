@@ -1,9 +1,41 @@
-from pymongo import MongoClient
-from pymongo.errors import PyMongoError, ConnectionFailure, ConfigurationError
+from pymongo import MongoClient, ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError, ConnectionFailure, ConfigurationError, BulkWriteError
 from src.core.logger import db_logger as logger
 from src.core.exception import CustomException
+from src.core.metrics import metrics, WRITE_SECONDS, WRITE_DOCS, DEDUP_SECONDS
 from .base import BaseDatabaseService
 import sys
+from typing import Iterator
+
+# Mongo duplicate key error
+DUPLICATE_KEY = 11000
+
+
+def upsert_operations(docs: list[dict], merge: bool = False) -> list:
+    """
+    Build `_id` keyed upserts for `docs`.
+    Args:
+        docs (list[dict]): Documents, each with an `_id`.
+        merge (bool): `$set` only the non-None fields of each doc (stored fields the
+            new doc lacks are kept), else replace the stored document as a whole.
+            A doc without any non-None field has nothing to set and is skipped
+            (Mongo rejects an empty `$set`).
+    Returns:
+        list: ReplaceOne / UpdateOne operations with upsert=True, possibly empty.
+    """
+    operations = []
+    for doc in docs:
+        if "_id" not in doc:
+            raise CustomException("Upserted documents need an '_id'.")
+        if merge:
+            fields = {k: v for k, v in doc.items() if k != "_id" and v is not None}
+            if not fields:
+                continue
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}, upsert=True))
+        else:
+            operations.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+    return operations
+
 
 class MongoDBService(BaseDatabaseService):
     def __init__(self,
@@ -29,7 +61,7 @@ class MongoDBService(BaseDatabaseService):
         if self._connected:
             return
         try:
-            logger.info(f"[task={self.task_id}] Connecting to MongoDB (collection={self.collection_name})")
+            logger.info("[task=%s] Connecting to MongoDB (collection=%s)", self.task_id, self.collection_name)
             self.client = MongoClient(self.uri, serverSelectionTimeoutMS=5000)
             
             self.client.admin.command("ping")
@@ -39,14 +71,14 @@ class MongoDBService(BaseDatabaseService):
             
             self.collection = db[self.collection_name]
             self._connected = True
-            logger.info(f"[task={self.task_id}] MongoDB connection established")
+            logger.info("[task=%s] MongoDB connection established", self.task_id)
         
         except (ConnectionFailure, ConfigurationError) as e:
-            logger.error(f"[task={self.task_id}] MongoDB connection error: {e}")
+            logger.error("[task=%s] MongoDB connection error: %s", self.task_id, e)
             raise CustomException(f"MongoDB connection failed: {str(e)}", sys)
         
         except Exception as e:
-            logger.error(f"[task={self.task_id}] Unexpected MongoDB connection error: {e}")
+            logger.error("[task=%s] Unexpected MongoDB connection error: %s", self.task_id, e)
             raise CustomException(f"Unexpected MongoDB connection error: {str(e)}", sys)
 
 
@@ -54,9 +86,9 @@ class MongoDBService(BaseDatabaseService):
         if self.client:
             try:
                 self.client.close()
-                logger.info(f"[task={self.task_id}] MongoDB connection closed")
+                logger.info("[task=%s] MongoDB connection closed", self.task_id)
             except Exception as e:
-                logger.error(f"[task={self.task_id}] Error closing MongoDB connection: {e}", exc_info=True)
+                logger.error("[task=%s] Error closing MongoDB connection: %s", self.task_id, e, exc_info=True)
                 raise CustomException(f"Error closing MongoDB connection: {e}") from e
             finally:
                 self._connected = False
@@ -78,47 +110,283 @@ class MongoDBService(BaseDatabaseService):
             raise CustomException("Mongo collection is not initialized.")
 
         try:
-            result = self.collection.insert_many(doc, ordered=False)
+            with metrics.timer(WRITE_SECONDS, collection=self.collection_name):
+                result = self.collection.insert_many(doc, ordered=False)
+            metrics.inc(WRITE_DOCS, len(result.inserted_ids), collection=self.collection_name)
             return list(result.inserted_ids)
         
         except PyMongoError as e:
-            logger.error(f"[task={self.task_id}] insert_many failed: {e} | docs_count={len(doc)}")
+            logger.error("[task=%s] insert_many failed: %s | docs_count=%s", self.task_id, e, len(doc))
             raise CustomException(f"MongoDB insert_many failed: {e}") from e
         except Exception as e:
-            logger.error(f"[task={self.task_id}] Unexpected insert error: {e}", exc_info=True)
+            logger.error("[task=%s] Unexpected insert error: %s", self.task_id, e, exc_info=True)
             raise CustomException(f"Unexpected MongoDB insert error: {e}") from e
 
 
-    def find(self, filter_query:dict = {} , row_limit:int = 0) -> list[dict]:
+    def bulk_write(self, operations:list, ordered:bool = False, skip_duplicates:bool = False) -> dict:
         """
-        Fetch documents.
+        Send a batch of write operations (InsertOne, ReplaceOne, UpdateOne...) in one round trip.
         Args:
-            filter_query (dict): Mongo filter. None -> {}.
-            row_limit (int): Max docs to return (0 = no limit).
+            operations (list): pymongo write operations.
+            ordered (bool): Stop at the first error (True) or let the server apply all it can.
+            skip_duplicates (bool): Count duplicate `_id` errors instead of failing the batch.
         Returns:
-            list[dict]: List of documents (ObjectId stringified).
+            dict: inserted, upserted, matched, modified and duplicates counts.
         """
         self._ensure_connection()
+        if not operations:
+            raise CustomException("Parameter 'operations' must be a non-empty list.")
         if self.collection is None:
             raise CustomException("Mongo collection is not initialized.")
-        
+
         try:
-            cursor = self.collection.find(filter_query)
-            if row_limit > 0:
-                cursor = cursor.limit(row_limit)
-
-            docs = []
-            for doc in cursor:
-                # Convert ObjectId to string for JSON friendliness
-                _id = doc.get("_id")
-                if _id is not None:
-                    doc["_id"] = str(_id)
-                docs.append(doc)
-            return docs
+            with metrics.timer(WRITE_SECONDS, collection=self.collection_name):
+                result = self.collection.bulk_write(operations, ordered=ordered)
+            metrics.inc(WRITE_DOCS, len(operations), collection=self.collection_name)
+            return {
+                "inserted": result.inserted_count,
+                "upserted": result.upserted_count,
+                "matched": result.matched_count,
+                "modified": result.modified_count,
+                "duplicates": 0,
+            }
 
+        except BulkWriteError as e:
+            details = e.details or {}
+            errors = details.get("writeErrors", [])
+            duplicates = sum(1 for err in errors if err.get("code") == DUPLICATE_KEY)
+            if skip_duplicates and duplicates == len(errors) and not details.get("writeConcernErrors"):
+                return {
+                    "inserted": details.get("nInserted", 0),
+                    "upserted": details.get("nUpserted", 0),
+                    "matched": details.get("nMatched", 0),
+                    "modified": details.get("nModified", 0),
+                    "duplicates": duplicates,
+                }
+            logger.error("[task=%s] bulk_write failed: %s write errors | ops_count=%s", self.task_id, len(errors), len(operations))
+            raise CustomException(f"MongoDB bulk_write failed: {e}") from e
         except PyMongoError as e:
-            logger.error(f"[task={self.task_id}] find failed: {e} | query={filter_query}")
+            logger.error("[task=%s] bulk_write failed: %s | ops_count=%s", self.task_id, e, len(operations))
+            raise CustomException(f"MongoDB bulk_write failed: {e}") from e
+        except Exception as e:
+            logger.error("[task=%s] Unexpected bulk_write error: %s", self.task_id, e, exc_info=True)
+            raise CustomException(f"Unexpected MongoDB bulk_write error: {e}") from e
+
+
+    def upsert_many(self, doc: list[dict], merge: bool = False) -> dict:
+        """
+        Insert or update multiple documents by `_id`, in one unordered round trip.
+        Re-scraped documents overwrite (or, with merge, update) the stored ones instead of
+        raising duplicate key errors.
+        Args:
+            doc (list[dict]): Documents, each with an `_id`.
+            merge (bool): Field-level `$set` of the non-None fields instead of a full replace.
+        Returns:
+            dict: inserted, updated and unchanged counts.
+        """
+        if not isinstance(doc, list) or not doc:
+            raise CustomException("Parameter 'doc' must be a non-empty list of dicts.")
+        if not all(isinstance(d, dict) for d in doc):
+            raise CustomException("All items in 'doc' must be dicts.")
+
+        operations = upsert_operations(doc, merge=merge)
+        if not operations:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+        result = self.bulk_write(operations, ordered=False)
+        return {
+            "inserted": result["upserted"],
+            "updated": result["modified"],
+            "unchanged": result["matched"] - result["modified"],
+        }
+
+
+    def touch_many(self, ids, fields:dict, chunk_size:int = 1000) -> int:
+        """
+        `$set` the same fields (e.g. a new `last_checked`) on many documents, without rewriting them.
+        Args:
+            ids (Iterable): `_id`s of the documents to update.
+            fields (dict): Field values to set.
+            chunk_size (int): Ids per update_many call.
+        Returns:
+            int: Number of matched documents.
+        """
+        self._ensure_connection()
+        ids = list(dict.fromkeys(ids))
+        if not fields:
+            raise CustomException("Parameter 'fields' must be a non-empty dict.")
+        if chunk_size <= 0:
+            raise CustomException("Parameter 'chunk_size' must be positive.")
+        if self.collection is None:
+            raise CustomException("Mongo collection is not initialized.")
+
+        try:
+            matched = 0
+            for start in range(0, len(ids), chunk_size):
+                with metrics.timer(WRITE_SECONDS, collection=self.collection_name):
+                    result = self.collection.update_many({"_id": {"$in": ids[start:start + chunk_size]}}, {"$set": fields})
+                matched += result.matched_count
+            return matched
+
+        except PyMongoError as e:
+            logger.error("[task=%s] update_many failed: %s | ids_count=%s", self.task_id, e, len(ids))
+            raise CustomException(f"MongoDB update_many failed: {e}") from e
+        except Exception as e:
+            logger.error("[task=%s] Unexpected update error: %s", self.task_id, e, exc_info=True)
+            raise CustomException(f"Unexpected MongoDB update error: {e}") from e
+
+
+    def touch_where(self, filter_query:dict, fields:dict) -> int:
+        """
+        `$set` the same fields on every document matching `filter_query` (e.g. backfill a missing field).
+        Args:
+            filter_query (dict): Mongo filter.
+            fields (dict): Field values to set.
+        Returns:
+            int: Number of modified documents.
+        """
+        self._ensure_connection()
+        if not fields:
+            raise CustomException("Parameter 'fields' must be a non-empty dict.")
+        if self.collection is None:
+            raise CustomException("Mongo collection is not initialized.")
+
+        try:
+            with metrics.timer(WRITE_SECONDS, collection=self.collection_name):
+                return self.collection.update_many(filter_query, {"$set": fields}).modified_count
+
+        except PyMongoError as e:
+            logger.error("[task=%s] update_many failed: %s | query=%s", self.task_id, e, filter_query)
+            raise CustomException(f"MongoDB update_many failed: {e}") from e
+        except Exception as e:
+            logger.error("[task=%s] Unexpected update error: %s", self.task_id, e, exc_info=True)
+            raise CustomException(f"Unexpected MongoDB update error: {e}") from e
+
+
+    def iter_find(self,
+                  filter_query:dict = None,
+                  projection:dict = None,
+                  sort:list = None,
+                  batch_size:int = 0,
+                  row_limit:int = 0,
+                  after = None,
+                  keyset:bool = False,
+                  stringify_id:bool = True) -> Iterator[dict]:
+        """
+        Lazily stream documents, the cursor fetches `batch_size` docs per round trip.
+        Args:
+            filter_query (dict): Mongo filter. None -> {}.
+            projection (dict): Fields to return, e.g. {"url": 1}. None -> whole documents.
+            sort (list): [(field, direction)] pairs, ignored in keyset mode (always `_id` ascending).
+            batch_size (int): Docs per cursor batch (0 = server default), also the keyset page size.
+            row_limit (int): Max docs to yield (0 = no limit).
+            after: Only yield documents whose `_id` is greater (resume point), implies `_id` order.
+            keyset (bool): Page with `_id > last_id` queries instead of one long-lived cursor,
+                so a scan over millions of docs never holds a cursor open for long.
+            stringify_id (bool): Convert `_id` to str (as find() does), False keeps the raw value.
+        Yields:
+            dict: Documents, one at a time.
+        """
+        self._ensure_connection()
+        if self.collection is None:
+            raise CustomException("Mongo collection is not initialized.")
+
+        filter_query = dict(filter_query or {})
+        hide_id = False
+        if keyset or after is not None:
+            sort = [("_id", 1)]
+            # keyset pages resume after the last `_id`, fetch it even when the projection excludes it
+            if isinstance(projection, dict) and not projection.get("_id", True):
+                projection, hide_id = {**projection, "_id": 1}, True
+        page_size = batch_size if keyset and batch_size > 0 else 0
+        yielded = 0
+
+        try:
+            while True:
+                query = filter_query
+                if after is not None:
+                    query = {"$and": [filter_query, {"_id": {"$gt": after}}]} if filter_query else {"_id": {"$gt": after}}
+
+                cursor = self.collection.find(query, projection)
+                if sort:
+                    cursor = cursor.sort(sort)
+                if batch_size > 0:
+                    cursor = cursor.batch_size(batch_size)
+                limit = page_size
+                if row_limit > 0:
+                    remaining = row_limit - yielded
+                    limit = min(limit, remaining) if limit else remaining
+                if limit:
+                    cursor = cursor.limit(limit)
+
+                page_count = 0
+                for doc in cursor:
+                    page_count += 1
+                    yielded += 1
+                    _id = doc.pop("_id") if hide_id else doc.get("_id")
+                    after = _id
+                    if stringify_id and _id is not None and not hide_id:
+                        # Convert ObjectId to string for JSON friendliness
+                        doc["_id"] = str(_id)
+                    yield doc
+
+                # single cursor, or the last (short) keyset page
+                if not page_size or page_count < page_size or (row_limit > 0 and yielded >= row_limit):
+                    return
+
+        except PyMongoError as e:
+            logger.error("[task=%s] find failed: %s | query=%s", self.task_id, e, filter_query)
             raise CustomException(f"MongoDB find failed: {e}") from e
         except Exception as e:
-            logger.error(f"[task={self.task_id}] Unexpected find error: {e}", exc_info=True)
-            raise CustomException(f"Unexpected MongoDB find error: {e}") from e
\ No newline at end of file
+            logger.error("[task=%s] Unexpected find error: %s", self.task_id, e, exc_info=True)
+            raise CustomException(f"Unexpected MongoDB find error: {e}") from e
+
+
+    def existing_ids(self, ids, chunk_size:int = 1000) -> set:
+        """
+        Which of `ids` are already stored. Runs chunked `$in` queries projected to `_id`
+        only, so the `_id` index answers them without reading documents.
+        Args:
+            ids (Iterable): Candidate `_id` values.
+            chunk_size (int): Ids per `$in` query.
+        Returns:
+            set: The subset of `ids` present in the collection (raw `_id` values).
+        """
+        ids = list(dict.fromkeys(ids))
+        if chunk_size <= 0:
+            raise CustomException("Parameter 'chunk_size' must be positive.")
+
+        found = set()
+        with metrics.timer(DEDUP_SECONDS, backend="mongo"):
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                for doc in self.iter_find({"_id": {"$in": chunk}}, projection={"_id": 1},
+                                          batch_size=len(chunk), stringify_id=False):
+                    found.add(doc["_id"])
+        return found
+
+
+    def count(self, filter_query:dict = None) -> int:
+        """
+        Number of documents matching `filter_query` (None -> whole collection).
+        """
+        self._ensure_connection()
+        if self.collection is None:
+            raise CustomException("Mongo collection is not initialized.")
+        try:
+            return self.collection.count_documents(filter_query or {})
+        except PyMongoError as e:
+            logger.error("[task=%s] count failed: %s | query=%s", self.task_id, e, filter_query)
+            raise CustomException(f"MongoDB count failed: {e}") from e
+
+
+    def find(self, filter_query:dict = {} , row_limit:int = 0, projection:dict = None) -> list[dict]:
+        """
+        Fetch documents.
+        Args:
+            filter_query (dict): Mongo filter. None -> {}.
+            row_limit (int): Max docs to return (0 = no limit).
+            projection (dict): Fields to return. None -> whole documents.
+        Returns:
+            list[dict]: List of documents (ObjectId stringified).
+        """
+        return list(self.iter_find(filter_query, projection=projection, row_limit=row_limit))
@@ -0,0 +1,164 @@
+import time
+import threading
+import statistics
+from dataclasses import dataclass, field
+from pymongo import InsertOne
+from src.core.logger import db_logger as logger
+from src.core.exception import CustomException
+from .mongo_service import MongoDBService, upsert_operations
+
+
+@dataclass
+class BatchStats:
+    """ Outcome of one flushed batch."""
+    size: int
+    written: int
+    duplicates: int
+    latency: float  # seconds spent in the bulk write
+    reason: str     # "size", "time", "close" or the one passed to flush()
+
+
+@dataclass
+class SinkReport:
+    """ Per-batch counts and latencies collected by MongoBufferedSink."""
+    batches: list[BatchStats] = field(default_factory=list)
+
+    @property
+    def docs(self) -> int:
+        return sum(b.size for b in self.batches)
+
+    @property
+    def written(self) -> int:
+        return sum(b.written for b in self.batches)
+
+    @property
+    def duplicates(self) -> int:
+        return sum(b.duplicates for b in self.batches)
+
+    def summary(self) -> str:
+        if not self.batches:
+            return "sink: no documents written"
+        latencies = [b.latency * 1000 for b in self.batches]
+        return (
+            f"sink: {self.docs} docs in {len(self.batches)} batches, "
+            f"written={self.written}, duplicates={self.duplicates}, "
+            f"batch latency ms p50={statistics.median(latencies):.1f} "
+            f"max={max(latencies):.1f} total={sum(latencies):.1f}"
+        )
+
+
+class MongoBufferedSink:
+    """
+    Buffered writer on top of MongoDBService: accepts documents one at a time
+    and flushes them as unordered bulk writes every `batch_size` documents or
+    `flush_interval` seconds, whichever comes first. A crash loses at most one
+    buffer instead of the whole run.
+
+    Args:
+        db (MongoDBService): Connected (or connectable) service.
+        batch_size (int): Flush once this many documents are buffered.
+        flush_interval (float): Flush buffered documents at least this often (seconds), 0 disables.
+        upsert (bool): Upsert by `_id` (see MongoDBService.upsert_many) instead of inserting,
+            so re-scraped documents update the stored ones.
+        merge (bool): With upsert, `$set` only the non-None fields instead of replacing.
+
+    Usage:
+        with MongoBufferedSink(db, batch_size=50) as sink:
+            for doc in docs:
+                sink.write(doc)
+        logger.info(sink.report.summary())
+    """
+    def __init__(self, db: MongoDBService, batch_size: int = 100, flush_interval: float = 10.0,
+                 upsert: bool = False, merge: bool = False):
+        self.db = db
+        self.upsert = upsert
+        self.merge = merge
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.report = SinkReport()
+
+        self._buffer: list[dict] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stop = threading.Event()
+        self._timer = None
+        if self.flush_interval > 0:
+            self._timer = threading.Thread(target=self._flush_periodically, name="mongo-sink", daemon=True)
+            self._timer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush(reason="time")
+            except CustomException:
+                # already logged by the service, next write/close will retry the buffer
+                pass
+
+    def _operations(self, docs: list[dict]) -> list:
+        if self.upsert:
+            return upsert_operations(docs, merge=self.merge)
+        return [InsertOne(doc) for doc in docs]
+
+    def write(self, doc: dict):
+        """ Buffer one document, flushing when the batch is full."""
+        if self._closed:
+            raise CustomException("MongoBufferedSink is closed.")
+        if not isinstance(doc, dict):
+            raise CustomException("Sink documents must be dicts.")
+        with self._lock:
+            self._buffer.append(doc)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush(reason="size")
+
+    def flush(self, reason: str = "manual") -> BatchStats | None:
+        """ Write out the buffered documents now."""
+        with self._lock:
+            if not self._buffer:
+                return None
+            docs = self._buffer
+            self._buffer = []
+
+            start = time.monotonic()
+            operations = self._operations(docs)
+            try:
+                if operations:
+                    result = self.db.bulk_write(operations, ordered=False, skip_duplicates=True)
+                else:  # merge upserts of docs with nothing to set
+                    result = {"inserted": 0, "upserted": 0, "modified": 0, "duplicates": 0}
+            except CustomException:
+                # keep the documents for the next flush attempt
+                self._buffer = docs + self._buffer
+                raise
+            stats = BatchStats(
+                size=len(docs),
+                written=result["inserted"] + result["upserted"] + result["modified"],
+                duplicates=result["duplicates"],
+                latency=time.monotonic() - start,
+                reason=reason,
+            )
+            self.report.batches.append(stats)
+
+        logger.info(
+            "[task=%s] sink flushed %s docs (%s) written=%s duplicates=%s in %.1f ms",
+            self.db.task_id, stats.size, reason, stats.written, stats.duplicates, stats.latency * 1000
+        )
+        return stats
+
+    def close(self) -> SinkReport:
+        """ Stop the timer, flush what is left and return the report."""
+        if self._closed:
+            return self.report
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+        self.flush(reason="close")
+        self._closed = True
+        logger.info("[task=%s] %s", self.db.task_id, self.report.summary())
+        return self.report
@@ -0,0 +1,289 @@
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+import redis
+from redis.exceptions import RedisError, WatchError
+from src.core.logger import db_logger as logger
+from src.core.exception import CustomException
+
+
+class RedisWorkQueue:
+    """
+    Distributed URL work queue on Redis with visibility-timeout leases.
+
+    Producers `push()` URLs, any number of workers `claim()` batches of them.
+    A claimed URL is leased for `lease_seconds`: `ack()` removes it for good,
+    `release()` hands it back, and leases that expire (crashed or stuck worker)
+    are put back in the queue by the next `claim()` / `requeue_expired()`.
+    A URL already queued or leased is not pushed twice.
+
+    Every claim stores a fresh owner token per URL. `ack()`, `extend()` and
+    `release()` only act on URLs whose token is still this instance's, so a worker
+    whose lease expired and was re-claimed elsewhere cannot drop the new holder's
+    lease or un-queue its URL. Long batches keep their leases with `keep_alive()`.
+
+    Keys (prefix `name`):
+        {name}:pending  LIST  URLs waiting to be claimed, FIFO
+        {name}:leases   ZSET  claimed URLs scored by lease expiry (epoch seconds)
+        {name}:queued   SET   every URL pending or leased, for de-duplication
+        {name}:owners   HASH  leased URL -> token of the claim holding it
+
+    Claims, acks, extends and requeues are WATCH/MULTI transactions, so no URL is handed to two
+    workers, and they run unchanged against a local Redis or fakeredis.
+
+    Args:
+        name (str): Key prefix of the queue.
+        client (redis.Redis, optional): Client to use (e.g. fakeredis.FakeRedis()), else one is built.
+        host, port, db, password: Connection settings when no client is given.
+        lease_seconds (float): Visibility timeout of a claim.
+        task_id (str, optional): For log lines.
+    """
+    def __init__(self,
+                 name: str = "internshala:urls",
+                 client: redis.Redis | None = None,
+                 host: str = "redis",
+                 port: int = 6379,
+                 db: int = 0,
+                 password: str | None = None,
+                 lease_seconds: float = 300,
+                 task_id=None):
+        if lease_seconds <= 0:
+            raise CustomException("Parameter 'lease_seconds' must be positive.")
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.task_id = task_id
+        self.client = client if client is not None else redis.Redis(
+            host=host, port=port, db=db, password=password, decode_responses=True, socket_timeout=10
+        )
+        self.pending_key = f"{name}:pending"
+        self.leases_key = f"{name}:leases"
+        self.queued_key = f"{name}:queued"
+        self.owners_key = f"{name}:owners"
+        # url -> token of this instance's claim on it
+        self._tokens: dict[str, str] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        try:
+            self.client.close()
+        except RedisError as e:
+            logger.error("[task=%s] Error closing Redis connection: %s", self.task_id, e)
+
+    @staticmethod
+    def _str(value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    def _fail(self, op: str, e: Exception):
+        logger.error("[task=%s] Redis queue '%s' %s failed: %s", self.task_id, self.name, op, e)
+        raise CustomException(f"Redis queue {op} failed: {e}") from e
+
+    def push(self, urls: Iterable[str]) -> int:
+        """ Queue URLs not already pending or leased. Returns how many were added."""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return 0
+        try:
+            with self.client.pipeline() as pipe:
+                while True:
+                    try:
+                        pipe.watch(self.queued_key)
+                        queued = pipe.smismember(self.queued_key, urls)
+                        added = [url for url, is_queued in zip(urls, queued) if not is_queued]
+                        if not added:
+                            pipe.unwatch()
+                            break
+                        pipe.multi()
+                        pipe.sadd(self.queued_key, *added)
+                        pipe.rpush(self.pending_key, *added)
+                        pipe.execute()
+                        break
+                    except WatchError:
+                        continue
+        except RedisError as e:
+            self._fail("push", e)
+        logger.info("[task=%s] queue '%s': pushed %s of %s urls", self.task_id, self.name, len(added), len(urls))
+        return len(added)
+
+    def claim(self, count: int = 1) -> list[str]:
+        """ Lease up to `count` URLs, expired leases are requeued first."""
+        if count <= 0:
+            return []
+        self.requeue_expired()
+        try:
+            with self.client.pipeline() as pipe:
+                while True:
+                    try:
+                        pipe.watch(self.pending_key)
+                        urls = [self._str(u) for u in pipe.lrange(self.pending_key, 0, count - 1)]
+                        if not urls:
+                            pipe.unwatch()
+                            return []
+                        expiry = time.time() + self.lease_seconds
+                        token = uuid.uuid4().hex
+                        pipe.multi()
+                        pipe.ltrim(self.pending_key, len(urls), -1)
+                        pipe.zadd(self.leases_key, {url: expiry for url in urls})
+                        pipe.hset(self.owners_key, mapping={url: token for url in urls})
+                        pipe.execute()
+                        self._tokens.update({url: token for url in urls})
+                        return urls
+                    except WatchError:
+                        # another worker claimed first, retry on the new head
+                        continue
+        except RedisError as e:
+            self._fail("claim", e)
+
+    def batches(self, size: int) -> Iterator[list[str]]:
+        """ Claim batches of `size` URLs until the queue is drained."""
+        while True:
+            batch = self.claim(size)
+            if not batch:
+                return
+            yield batch
+
+    def _held(self, pipe, urls: list[str]) -> list[str]:
+        """ The URLs whose lease is still owned by this instance's claim (call under WATCH of owners)."""
+        owners = [self._str(owner) for owner in pipe.hmget(self.owners_key, urls)]
+        return [url for url, owner in zip(urls, owners) if owner is not None and owner == self._tokens.get(url)]
+
+    def _on_held(self, op: str, urls: list[str], apply) -> int:
+        """
+        Atomically run `apply(pipe, held)` on the URLs this instance still holds.
+        Returns how many were held.
+        """
+        try:
+            with self.client.pipeline() as pipe:
+                while True:
+                    try:
+                        pipe.watch(self.owners_key)
+                        held = self._held(pipe, urls)
+                        if not held:
+                            pipe.unwatch()
+                            return 0
+                        pipe.multi()
+                        apply(pipe, held)
+                        pipe.execute()
+                        return len(held)
+                    except WatchError:
+                        continue
+        except RedisError as e:
+            self._fail(op, e)
+
+    def _forget(self, urls: Iterable[str]):
+        for url in urls:
+            self._tokens.pop(url, None)
+
+    def ack(self, urls: Iterable[str]) -> int:
+        """ Mark leased URLs done. Returns how many leases were still held by this worker."""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return 0
+
+        def done(pipe, held):
+            pipe.zrem(self.leases_key, *held)
+            pipe.srem(self.queued_key, *held)
+            pipe.hdel(self.owners_key, *held)
+        acked = self._on_held("ack", urls, done)
+        self._forget(urls)
+        if acked < len(urls):
+            logger.warning("[task=%s] queue '%s': %s acks after lease expiry, left to their current holder",
+                           self.task_id, self.name, len(urls) - acked)
+        return acked
+
+    def extend(self, urls: Iterable[str]) -> int:
+        """ Renew the lease of URLs still held by this worker (heartbeat for slow batches)."""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return 0
+        expiry = time.time() + self.lease_seconds
+        return self._on_held("extend", urls,
+                             lambda pipe, held: pipe.zadd(self.leases_key, {url: expiry for url in held}, xx=True))
+
+    @contextmanager
+    def keep_alive(self, urls: Iterable[str], interval: float | None = None) -> Iterator[None]:
+        """
+        Extend the leases of `urls` from a background thread while the block runs,
+        every `interval` seconds (default a third of `lease_seconds`).
+
+        Usage:
+            for urls in queue.batches(25):
+                with queue.keep_alive(urls):
+                    ...scrape and persist...
+                queue.ack(urls)
+        """
+        urls = list(urls)
+        interval = interval or self.lease_seconds / 3
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(interval):
+                try:
+                    self.extend(urls)
+                except CustomException:
+                    pass  # logged by _fail, the next beat tries again
+
+        thread = threading.Thread(target=heartbeat, name=f"lease-{self.name}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def _move_leases(self, op: str, select) -> int:
+        """ Atomically move the leased URLs chosen by `select(pipe)` back to pending."""
+        try:
+            with self.client.pipeline() as pipe:
+                while True:
+                    try:
+                        pipe.watch(self.leases_key, self.owners_key)
+                        urls = [self._str(u) for u in select(pipe)]
+                        if not urls:
+                            pipe.unwatch()
+                            return 0
+                        pipe.multi()
+                        pipe.zrem(self.leases_key, *urls)
+                        pipe.hdel(self.owners_key, *urls)
+                        pipe.rpush(self.pending_key, *urls)
+                        pipe.execute()
+                        return len(urls)
+                    except WatchError:
+                        continue
+        except RedisError as e:
+            self._fail(op, e)
+
+    def release(self, urls: Iterable[str]) -> int:
+        """ Give URLs leased by this worker back to the queue (e.g. on graceful shutdown)."""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return 0
+        released = self._move_leases("release", lambda pipe: self._held(pipe, urls))
+        self._forget(urls)
+        return released
+
+    def requeue_expired(self) -> int:
+        """ Put URLs whose lease ran out back in the queue. Returns how many."""
+        moved = self._move_leases(
+            "requeue", lambda pipe: pipe.zrangebyscore(self.leases_key, "-inf", time.time())
+        )
+        if moved:
+            logger.warning("[task=%s] queue '%s': requeued %s expired leases", self.task_id, self.name, moved)
+        return moved
+
+    def stats(self) -> dict:
+        """ Pending and leased counts."""
+        try:
+            pipe = self.client.pipeline()
+            pipe.llen(self.pending_key)
+            pipe.zcard(self.leases_key)
+            pending, leased = pipe.execute()
+        except RedisError as e:
+            self._fail("stats", e)
+        return {"pending": pending, "leased": leased}
@@ -0,0 +1,233 @@
+import os
+import math
+import mmap
+import struct
+import hashlib
+from typing import Callable, Iterable
+from contextlib import contextmanager
+from src.constants import Constants
+from src.core.logger import db_logger as logger
+from src.core.exception import CustomException
+from src.core.metrics import metrics, DEDUP_SECONDS
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, single process use only there
+    fcntl = None
+
+# magic, version, hash count k, bit count m, item count, capacity
+_HEADER = struct.Struct("<8sIIQQQ")
+_HEADER_SIZE = 64
+_MAGIC = b"SEENBLM1"
+_VERSION = 1
+
+
+class SeenUrlIndex:
+    """
+    Persistent Bloom filter of stored `_id`s, memory-mapped from `Constants.seen_index_path`.
+
+    Sits in front of Mongo: ids the filter has never seen are definitely new and
+    skip the database, only probable hits are confirmed with a query. The filter
+    can be stale only in the safe direction if docs are written elsewhere (a
+    missing id is re-scraped, and upserted), `rebuild_from()` resyncs it.
+
+    Args:
+        path (str): Index file, created on first rebuild.
+        capacity (int): Expected number of ids, the filter is resized on rebuild when exceeded.
+        error_rate (float): Target false positive rate at capacity.
+
+    Usage:
+        with SeenUrlIndex() as index:
+            if index.stale:
+                index.rebuild_from(db)
+            existing = index.existing(ids, db.existing_ids)
+    """
+    def __init__(self, path: str = Constants.seen_index_path, capacity: int = 100_000, error_rate: float = 0.01):
+        if not 0 < error_rate < 1:
+            raise CustomException("Parameter 'error_rate' must be between 0 and 1.")
+        self.path = path
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self._file = None
+        self._mm = None
+        self._inode = None
+        self._k = 0
+        self._m = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # --- file handling ---
+
+    def open(self):
+        """ Map the index file if it exists (a missing file acts as an empty, stale index)."""
+        self.close()
+        if not os.path.exists(self.path):
+            return
+        try:
+            self._file = open(self.path, "r+b")
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+            magic, version, k, m, _, capacity = _HEADER.unpack_from(self._mm, 0)
+            if magic != _MAGIC or version != _VERSION or len(self._mm) < _HEADER_SIZE + (m + 7) // 8:
+                raise ValueError("bad header")
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("Seen index %s unreadable (%s), it will be rebuilt", self.path, e)
+            self.close()
+            return
+        self._k, self._m, self.capacity = k, m, capacity
+        self._inode = os.fstat(self._file.fileno()).st_ino
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        if self._file is not None:
+            self._file.close()
+        self._mm = self._file = self._inode = None
+
+    @contextmanager
+    def _locked(self):
+        """ Exclusive cross-process lock for writers, readers never block."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _reopen_if_replaced(self):
+        # another process rebuilt the file: our map still points at the old inode
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return
+        if inode != self._inode:
+            self.open()
+
+    # --- bloom filter ---
+
+    @staticmethod
+    def _size(capacity: int, error_rate: float) -> tuple[int, int]:
+        m = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        k = max(1, round(m / capacity * math.log(2)))
+        return k, m
+
+    def _positions(self, item) -> Iterable[int]:
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self._m
+        return ((h1 + i * h2) % m for i in range(self._k))
+
+    def _set(self, mm, item) -> bool:
+        """ Set the item's bits, True if any was unset (item is new)."""
+        new = False
+        for pos in self._positions(item):
+            offset, bit = _HEADER_SIZE + (pos >> 3), 1 << (pos & 7)
+            byte = mm[offset]
+            if not byte & bit:
+                mm[offset] = byte | bit
+                new = True
+        return new
+
+    def __contains__(self, item) -> bool:
+        mm = self._mm
+        if mm is None:
+            return False
+        for pos in self._positions(item):
+            if not mm[_HEADER_SIZE + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        if self._mm is None:
+            return 0
+        return _HEADER.unpack_from(self._mm, 0)[4]
+
+    @property
+    def stale(self) -> bool:
+        """ Missing, unreadable or filled past capacity (false positive rate above target)."""
+        return self._mm is None or len(self) > self.capacity
+
+    # --- public API ---
+
+    def partition(self, ids: Iterable) -> tuple[list, list]:
+        """ Split ids into (definitely new, probably stored)."""
+        misses, maybe = [], []
+        for item in ids:
+            (maybe if item in self else misses).append(item)
+        return misses, maybe
+
+    def existing(self, ids: Iterable, confirm: Callable[[list], set]) -> set:
+        """
+        Stored ids among `ids`, only the probable hits are passed to `confirm`
+        (e.g. MongoDBService.existing_ids).
+        """
+        ids = list(ids)
+        if self._mm is None:
+            return set(confirm(ids)) if ids else set()
+        with metrics.timer(DEDUP_SECONDS, backend="bloom"):
+            misses, maybe = self.partition(ids)
+        found = set(confirm(maybe)) if maybe else set()
+        logger.info(
+            "Seen index: %s ids, %s definite misses skipped the db, %s probable hits confirmed %s",
+            len(ids), len(misses), len(maybe), len(found)
+        )
+        return found
+
+    def add(self, ids: Iterable) -> int:
+        """ Record stored ids (call after a successful persist). Returns how many were new."""
+        ids = list(ids)
+        if not ids:
+            return 0
+        if self._mm is None:
+            raise CustomException(f"Seen index {self.path} does not exist, rebuild it first.")
+        with self._locked():
+            self._reopen_if_replaced()
+            mm = self._mm
+            added = sum(self._set(mm, item) for item in ids)
+            header = list(_HEADER.unpack_from(mm, 0))
+            header[4] += added
+            _HEADER.pack_into(mm, 0, *header)
+            mm.flush()
+        return added
+
+    def rebuild(self, ids: Iterable) -> int:
+        """ Replace the index with exactly `ids`, sized for max(capacity, 2 x len(ids))."""
+        ids = list(ids)
+        capacity = max(self.capacity, 2 * len(ids))
+        k, m = self._size(capacity, self.error_rate)
+        size = _HEADER_SIZE + (m + 7) // 8
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._locked():
+            try:
+                with open(tmp_path, "w+b") as f:
+                    f.truncate(size)
+                    with mmap.mmap(f.fileno(), size) as mm:
+                        self._k, self._m = k, m
+                        count = sum(self._set(mm, item) for item in ids)
+                        _HEADER.pack_into(mm, 0, _MAGIC, _VERSION, k, m, count, capacity)
+                        mm.flush()
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise CustomException(f"Seen index rebuild failed: {e}") from e
+            self.open()
+
+        logger.info("Seen index rebuilt: %s ids, %.0f KB, k=%s, capacity=%s", count, size / 1024, k, capacity)
+        return count
+
+    def rebuild_from(self, db) -> int:
+        """ Rebuild from every `_id` in the MongoDBService collection (streamed, index-only)."""
+        return self.rebuild(
+            doc["_id"] for doc in db.iter_find(projection={"_id": 1}, batch_size=5000, keyset=True, stringify_id=False)
+        )
@@ -0,0 +1,68 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+from urllib.parse import urlparse
+
+T = TypeVar("T")
+
+
+class AsyncFetchEngine:
+    """
+    Bounded asyncio runner for the blocking bf4_client helpers.
+
+    Every call is dispatched to a private thread pool, gated by a global
+    semaphore (total requests in flight) and a per-host semaphore, so N
+    requests per host overlap instead of running back to back.
+
+    Args:
+        max_concurrency (int): Upper bound on requests in flight across all hosts.
+        per_host_concurrency (int): Upper bound on requests in flight per host.
+    """
+    def __init__(self, max_concurrency: int = 8, per_host_concurrency: int = 4):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_host_concurrency = max(1, min(int(per_host_concurrency), self.max_concurrency))
+        self._global_sem: asyncio.Semaphore | None = None
+        self._host_sems: dict[str, asyncio.Semaphore] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def __aenter__(self) -> "AsyncFetchEngine":
+        self._global_sem = asyncio.Semaphore(self.max_concurrency)
+        self._host_sems = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="fetch"
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            # queued calls are dropped, running ones are awaited off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, partial(executor.shutdown, wait=True, cancel_futures=True))
+
+    def _host_sem(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        sem = self._host_sems.get(host)
+        if sem is None:
+            sem = self._host_sems[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return sem
+
+    async def run(self, url: str, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """
+        Run `func(*args, **kwargs)` on the pool once a slot for `url`'s host is free.
+        """
+        if self._executor is None or self._global_sem is None:
+            raise RuntimeError("AsyncFetchEngine must be used as 'async with' context")
+
+        loop = asyncio.get_running_loop()
+        async with self._global_sem, self._host_sem(url):
+            return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def map(self, urls: Iterable[str], call: Callable[[str], Awaitable[T]]) -> list[T]:
+        """
+        Await `call(url)` for every url concurrently, results in input order.
+        The first exception is propagated, same as the sequential loop.
+        """
+        return list(await asyncio.gather(*(call(url) for url in urls)))
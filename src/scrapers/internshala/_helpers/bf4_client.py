@@ -1,145 +1,314 @@
+import re
 import sys
 import time
+import hashlib
 import requests
-from bs4 import BeautifulSoup
+from dataclasses import dataclass
+from urllib.parse import urlsplit
 from src.core.models import JobDetails
 from src.core.exception import CustomException
-from src.core.utils import _extract_posting_date
 from src.core.logger import scraper_logger as logger
+from src.core.rescrape import utc_now_iso
+from src.core.metrics import metrics, FETCH_SECONDS, WAIT_SECONDS, PARSE_SECONDS, EXTRACT_SECONDS, FETCH_ERRORS
+from .rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from .retry import RetryPolicy, CircuitBreaker, FetchStats, FetchError
+from .cassette import Cassette
+from .html_backends import ParserBackend, Node, get_backend, slice_region, element_end
+from .extraction import ExtractionEngine, DEFAULT_ENGINE
+
+# Fallback for direct callers without a limiter, one request every 5 seconds
+_default_limiter = AdaptiveRateLimiter(rate=0.2, burst=1, min_rate=0.2, max_rate=0.2)
+# Fallback retry policy for direct callers
+_default_retry = RetryPolicy()
+# `source` label of this client's metrics
+SOURCE = "internshala"
+
+
+def _fetch(
+    url:str,
+    header:dict,
+    timeout:float | None,
+    limiter:AdaptiveRateLimiter | None,
+    session:requests.Session | None,
+    retry:RetryPolicy | None = None,
+    breaker:CircuitBreaker | None = None,
+    stats:FetchStats | None = None,
+    cassette:Cassette | None = None
+    ) -> requests.Response:
+    """
+    Rate-limited GET through the shared session (or a one-off connection).
+    Feeds status and latency back to the limiter.
+
+    Transient failures (timeouts, connection errors, 408/429/5xx) are retried with
+    exponential backoff and jitter, while the host's circuit breaker is open the call waits.
+    Any other response, 404 included, is returned to the caller.
+
+    A recording `cassette` stores that final response, a replaying one answers
+    instead of the network (no rate limiting, no retries).
+
+    Raises:
+        FetchError: Fatal network error, or retries exhausted (carries status and attempts).
+    """
+    if cassette is not None and cassette.replaying:
+        return cassette.replay(url)
+    limiter = limiter or _default_limiter
+    retry = retry or _default_retry
+    http = session if session is not None else requests
+    host = urlsplit(url).netloc
+
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker is not None:
+            waited = breaker.acquire(host)
+            if waited:
+                metrics.observe(WAIT_SECONDS, waited, source=SOURCE, reason="breaker")
+                if stats is not None:
+                    stats.add(breaker_wait=waited)
+        # a half-open probe slot is given back however the attempt ends (KeyboardInterrupt included)
+        try:
+            with metrics.timer(WAIT_SECONDS, source=SOURCE, reason="rate_limit"):
+                limiter.acquire()
+            if stats is not None:
+                stats.add(requests=1)
+
+            error, response, retry_after = None, None, None
+            start = time.monotonic()
+            try:
+                response = http.get(url, headers= header, timeout= timeout)
+            except requests.RequestException as e:
+                error = e
+            else:
+                retry_after = response.headers.get("Retry-After")
+                limiter.feedback(response.status_code, time.monotonic() - start, retry_after)
+
+            status = response.status_code if response is not None else None
+            metrics.observe(FETCH_SECONDS, time.monotonic() - start, source=SOURCE, status=status or "error")
+            transient = retry.retryable(error, status)
+            if breaker is not None:
+                if transient:
+                    breaker.record_failure(host)
+                else:
+                    breaker.record_success(host)
+        finally:
+            if breaker is not None:
+                breaker.release(host)
+        if error is None and not transient:
+            if cassette is not None:
+                cassette.record(url, response)
+            return response
+
+        reason = f"{type(error).__name__}: {error}" if error is not None else f"HTTP {status}"
+        metrics.inc(FETCH_ERRORS, source=SOURCE, error=type(error).__name__ if error is not None else status)
+        if not transient or attempt >= retry.max_attempts:
+            if stats is not None:
+                stats.add(failures=1)
+            raise FetchError(
+                f"Fetching {url} failed after {attempt} attempt(s): {reason}",
+                url= url, status= status, attempts= attempt, retryable= transient,
+                error_class= type(error).__name__ if error is not None else None
+            )
+
+        delay = retry.delay(attempt, parse_retry_after(retry_after))
+        logger.warning("Attempt %d/%d for %s failed (%s), retrying in %.1fs", attempt, retry.max_attempts, url, reason, delay)
+        if stats is not None:
+            stats.add(retries=1, retry_wait=delay)
+        metrics.observe(WAIT_SECONDS, delay, source=SOURCE, reason="retry")
+        time.sleep(delay)
+
+
+def _http_error(url:str, e:requests.RequestException) -> FetchError:
+    """ FetchError for a non-retryable HTTP error status (raise_for_status)."""
+    status = e.response.status_code if e.response is not None else None
+    return FetchError(f"Network error during scraping: {str(e)}", url= url, status= status, error_class= type(e).__name__)
+
+
+@dataclass(frozen=True)
+class Unchanged:
+    """ A re-scraped page whose fingerprint matches the stored one, it was not parsed."""
+    url: str
+    fingerprint: str
+    last_checked: str
+
+
+@dataclass(frozen=True)
+class Removed:
+    """ A job page that answered 404, the listing is gone."""
+    url: str
+
+
+# elements whose text changes on their own, e.g. `.status` "Posted 2 days ago"
+_VOLATILE = re.compile(
+    rb'<[a-zA-Z][a-zA-Z0-9]*\b[^>]*(?<![\w-])class\s*=\s*(["\'])[^"\']*(?<![\w-])status(?![\w-])[^"\']*\1',
+    re.IGNORECASE)
+
+
+def _strip_volatile(content:bytes) -> bytes:
+    parts, pos = [], 0
+    for m in _VOLATILE.finditer(content):
+        if m.start() < pos:
+            continue  # nested in an element already cut
+        end = element_end(content, m.start())
+        if end is None:
+            break
+        parts.append(content[pos:m.start()])
+        pos = end
+    parts.append(content[pos:])
+    return b"".join(parts)
+
+
+def _fingerprint(content:bytes, container_id:str | None = None) -> str:
+    """
+    Content hash of a job details page: the detail container (whole page if missing)
+    without the `.status` posted-date element and with whitespace collapsed, so the
+    ageing "Posted N days ago" and markup reflows don't count as changes.
+    """
+    region = slice_region(content, container_id) if container_id else None
+    region = _strip_volatile(region if region is not None else content)
+    normalized = re.sub(rb"\s+", b" ", region)
+    return hashlib.blake2b(normalized, digest_size=16).hexdigest()
+
+
+def _first_descendant(parser:ParserBackend, node:Node, tag:str, cls:str | None = None) -> Node | None:
+    """ First `tag` element (optionally with class `cls`) under `node`."""
+    for elem in parser.iter_elements(node):
+        if parser.tag(elem) == tag and (cls is None or cls in parser.classes(elem)):
+            return elem
+    return None
+
+
+def _parse_job_details(
+    content:bytes,
+    url:str,
+    parser:ParserBackend | None = None,
+    engine:ExtractionEngine | None = None,
+    container_id:str | None = None
+    ) -> JobDetails:
+    """
+    Parse a job details page, no network involved.
+    Fields are filled in one pass by the compiled spec in src/config/internshala_fields.json.
+    With `container_id` only that element's subtree is parsed, headers, footers,
+    scripts and recommendation blocks around it are never turned into a tree.
+    """
+    parser = parser or get_backend()
+    with metrics.timer(PARSE_SECONDS, source=SOURCE, page="detail"):
+        root = parser.parse_partial(content, container_id) if container_id else parser.parse(content)
+    with metrics.timer(EXTRACT_SECONDS, source=SOURCE):
+        return (engine or DEFAULT_ENGINE).extract(parser, root, url)
+
+
+def _parse_job_urls(content:bytes, base_url:str, parser:ParserBackend | None = None) -> list[str]:
+    """
+    Extract absolute job URLs from a search results page, no network involved.
+    Matches `div.container-fluid.individual_internship` cards and their `a.job-title-href`.
+    """
+    parser = parser or get_backend()
+    url_list = []
+    with metrics.timer(PARSE_SECONDS, source=SOURCE, page="listing"):
+        root = parser.parse(content)
+    for elem in parser.iter_elements(root):
+        if parser.tag(elem) != "div":
+            continue
+        cls = parser.classes(elem)
+        if "individual_internship" in cls and "container-fluid" in cls:
+            job_link = _first_descendant(parser, elem, "a", "job-title-href")
+            href = parser.attr(job_link, "href") if job_link is not None else None
+            if href is not None:
+                # Get the href attribute and append it to the base URL
+                url_list.append(base_url + str(href))
+    return url_list
+
 
 def _scrape_job_details(
     header:dict,
-    url:str
-    ) -> JobDetails | None:
+    url:str,
+    timeout:float | None = None,
+    limiter:AdaptiveRateLimiter | None = None,
+    session:requests.Session | None = None,
+    parser:ParserBackend | None = None,
+    container_id:str | None = None,
+    known_fingerprint:str | None = None,
+    retry:RetryPolicy | None = None,
+    breaker:CircuitBreaker | None = None,
+    stats:FetchStats | None = None,
+    cassette:Cassette | None = None
+    ) -> JobDetails | Unchanged | Removed:
     """
     Scrape job details from an Internshala job posting URL.
     
     Args:
         header (dict): HTTP headers to use for the request
         url (str): The URL of the job posting to scrape
+        timeout (float, optional): Per-request timeout in seconds, None waits forever
+        limiter (AdaptiveRateLimiter, optional): Shared rate limiter, defaults to one request per 5 seconds
+        session (requests.Session, optional): Pooled session to reuse connections, defaults to a one-off request
+        parser (ParserBackend, optional): HTML parser backend, defaults to bs4 'html.parser'
+        container_id (str, optional): Parse only the element with this id, None parses the whole page
+        known_fingerprint (str, optional): Stored fingerprint of the page, a match skips parsing
+        retry (RetryPolicy, optional): Backoff for transient failures, defaults to 3 attempts
+        breaker (CircuitBreaker, optional): Shared per-host circuit breaker
+        stats (FetchStats, optional): Shared retry / failure counters
+        cassette (Cassette, optional): Record responses to, or replay them from, an on-disk cassette
         
     Returns:
-        Optional[JobDetails]: A JobDetails object containing the extracted information,
-                             or None if the page returns a 404 status
+        JobDetails: A JobDetails object containing the extracted information,
+                             or Removed if the page returns a 404 status,
+                             or Unchanged if the page matches `known_fingerprint`
                              
     Raises:
-        CustomException: If a network error occurs or if there's an error during scraping
+        FetchError: If the page could not be fetched (fatal error or retries exhausted)
+        CustomException: If there's an error during scraping
     """
     try:
-        # Add a random delay to avoid rate limiting
-        time.sleep(5)
-        logger.info(f"init job details Scraping for {url}")
+        logger.info("init job details Scraping for %s", url)
         
         # Send a GET request to the URL
-        response = requests.get(url, headers= header)
+        response = _fetch(url, header, timeout, limiter, session, retry, breaker, stats, cassette)
         
         # Continue to next link incase of 404
         if response.status_code == 404:
-            logger.warning(f"404 not found error for {url} - skipping this job")
-            return None
+            logger.warning("404 not found error for %s - skipping this job", url)
+            return Removed(url)
         response.raise_for_status()
         logger.info("Got the response from url")
+        checked = utc_now_iso()
+
+        # Same content as the stored copy, nothing to parse or rewrite
+        fingerprint = _fingerprint(response.content, container_id)
+        if fingerprint == known_fingerprint:
+            logger.info("Unchanged since last scrape %s", url)
+            return Unchanged(url, fingerprint, checked)
     
-        # Parse the BeautifulSoup constructor
-        soup = BeautifulSoup(response.content, 'html.parser')
-        job = JobDetails()
-        job.url = url
-        
-        # job tile
-        title_element = soup.select_one('.heading_4_5.profile')
-        if title_element:
-            job.title = title_element.text.strip()
-    
-        # company name
-        company_element = soup.select_one('.company_and_premium a')
-        if company_element:
-            job.company = company_element.text.strip()
-        
-        # location
-        location_element = soup.select_one('#location_names span')
-        if location_element:
-            job.location = location_element.text.strip()
-        
-        # start date
-        start_date_element = soup.select_one('#start-date-first')
-        if start_date_element:
-            job.start_date = start_date_element.text.strip()
-        
-        # duration
-        duration_elements = soup.select('.item_body')
-        for elem in duration_elements:
-            if 'Month' in elem.text:
-                job.duration = elem.text.strip()
-                break
-            
-        # stipend
-        stipend_element = soup.select_one('.stipend')
-        if stipend_element:
-            job.stipend = stipend_element.text.strip()
-        
-        # apply by date
-        apply_by_elements = soup.select('.item_body')
-        for elem in apply_by_elements:
-            if "'" in elem.text and len(elem.text.strip()) < 15:
-                job.apply_by = elem.text.strip()
-                break
-            
-        # responsibilities
-        responsibilities_element = soup.select_one('.about_heading + .text-container')
-        if responsibilities_element:
-            job.responsibilities = responsibilities_element.text.strip()
-        
-        # skills required
-        skills_elements = soup.select('.skills_heading + .round_tabs_container .round_tabs')
-        if skills_elements:
-            job.skills_required = ', '.join([skill.text.strip() for skill in skills_elements])
-        
-        # other requirements
-        other_req_element = soup.select_one('.text-container.additional_detail')
-        if other_req_element:
-            job.other_requirements = other_req_element.text.strip()
-        
-        # perks
-        perks_elements = soup.select('.perks_heading + .round_tabs_container .round_tabs')
-        if perks_elements:
-            job.perks = ', '.join([perk.text.strip() for perk in perks_elements])
-        
-        # number of openings
-        openings_element = soup.select_one('.section_heading:-soup-contains("Number of openings") + .text-container')
-        if openings_element:
-            job.openings = openings_element.text.strip()
-        
-        # company description
-        company_desc_element = soup.select_one('.text-container.about_company_text_container')
-        if company_desc_element:
-            job.company_description = company_desc_element.text.strip()
-            
-        # Extract posted date (from text like "Posted 1 day ago")
-        posted_date_element = soup.select_one('.status.status-success')
-        if posted_date_element:
-            posted_text = posted_date_element.text.strip()
-            job.posted_date = _extract_posting_date(posted_text)
-            
-        # Extract Company url if possible.
-        company_url = soup.select_one('.website_link a')
-        if company_url and company_url.has_attr('href'):
-            job.company_url = str(company_url['href'])
-        
+        # Parse and extract every field in one pass
+        job = _parse_job_details(response.content, url, parser, container_id=container_id)
+        job.fingerprint = fingerprint
+        job.last_checked = checked
         return job
         
+    except FetchError as e:
+        logger.error("Network error when accessing %s: %s", url, e.args[0])
+        raise
     except requests.RequestException as e:
-        logger.error(f"Network error when accessing {url}: {str(e)}")
-        raise CustomException(f"Network error during scraping: {str(e)}", sys)
+        logger.error("Network error when accessing %s: %s", url, e)
+        raise _http_error(url, e)
     except Exception as e:
-        logger.error(f"Excepton occured while fetching 'Job Details' from {url}\n: {str(e)}",)
-        raise CustomException(f"Error occured during scraping Job details for {url}", sys)
+        logger.error("Excepton occured while fetching 'Job Details' from %s\n: %s", url, e)
+        raise CustomException(f"Error occured during scraping Job details for {url}", sys) from e
     
     
     
 def _get_jobDetails_url(
     header:dict,
     source_url:str,
-    base_url:str = "https://internshala.com"
+    base_url:str = "https://internshala.com",
+    timeout:float | None = None,
+    limiter:AdaptiveRateLimiter | None = None,
+    session:requests.Session | None = None,
+    parser:ParserBackend | None = None,
+    retry:RetryPolicy | None = None,
+    breaker:CircuitBreaker | None = None,
+    stats:FetchStats | None = None,
+    cassette:Cassette | None = None
     ) -> list[str]:
     """
     Scrape job listing URLs from an Internshala search results page.
@@ -148,56 +317,49 @@ def _get_jobDetails_url(
         header (dict): HTTP headers to use for the request
         source_url (str): The source URL as per config
         base_url (str, optional): The base URL to prepend to relative URLs. Defaults to "https://internshala.com"
+        timeout (float, optional): Per-request timeout in seconds, None waits forever
+        limiter (AdaptiveRateLimiter, optional): Shared rate limiter, defaults to one request per 5 seconds
+        session (requests.Session, optional): Pooled session to reuse connections, defaults to a one-off request
+        parser (ParserBackend, optional): HTML parser backend, defaults to bs4 'html.parser'
+        retry, breaker, stats, cassette: Retry policy, circuit breaker, counters and cassette, see _scrape_job_details
     
     Returns:
         List[str]: A list of absolute URLs for individual job listings
         
     Raises:
-        CustomException: If network errors occur during scraping or if parsing fails
+        FetchError: If the page could not be fetched (fatal error or retries exhausted)
+        CustomException: If parsing fails
     """
     try:
-        # Add a random delay to avoid rate limiting
-        time.sleep(5)
-        logger.info(f"init links Scraping \n{source_url}")
+        logger.info("init links Scraping \n%s", source_url)
         
         # Send a GET request to the URL and soup
-        response = requests.get(source_url, headers= header)
+        response = _fetch(source_url, header, timeout, limiter, session, retry, breaker, stats, cassette)
         
         # Continue to next link incase of 404
         if response.status_code == 404:
-            logger.warning(f"404 not found error for {source_url} - skipping this URL")
+            logger.warning("404 not found error for %s - skipping this URL", source_url)
             return []
         
         response.raise_for_status()  # Raise an exception for HTTP errors
         logger.info("got response from the source url")
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find all job listings
-        job_listings = soup.select('div.container-fluid.individual_internship')
-        
-        # Extract job URLs from each listing
-        url_list = []
-        for job in job_listings:
-            job_link = job.select_one('a.job-title-href')
-            if job_link and job_link.has_attr('href'):
-                
-                # Get the href attribute and append it to the base URL
-                href = job_link['href']
-                full_url = base_url + str(href)
-                url_list.append(full_url)
+        url_list = _parse_job_urls(response.content, base_url, parser)
                 
         if len(url_list) > 0:
             logger.info("Successfull scraping for links")
             return url_list
         
         else:
-            logger.warning(f"recived Empty response from source \n{source_url}")
+            logger.warning("recived Empty response from source \n%s", source_url)
             return []
 
+    except FetchError as e:
+        logger.error("Network error when accessing %s: %s", source_url, e.args[0])
+        raise
     except requests.RequestException as e:
-        logger.error(f"Network error when accessing {source_url}: {str(e)}")
-        raise CustomException(f"Network error during scraping: {str(e)}", sys)
+        logger.error("Network error when accessing %s: %s", source_url, e)
+        raise _http_error(source_url, e)
     except Exception as e:
-        logger.error(f"Excepton occured while fetching 'Job urls' from {source_url}\n", e)
+        logger.error("Excepton occured while fetching 'Job urls' from %s\n: %s", source_url, e)
         raise CustomException(f"Error occured during scraping Job list for {source_url}")
\ No newline at end of file
@@ -0,0 +1,137 @@
+import os
+import json
+import gzip
+import hashlib
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+from src.constants import Constants
+from src.core.config import ScraperConfig
+from src.core.exception import CustomException
+from src.core.logger import scraper_logger as logger
+from .retry import FetchError
+
+RECORD, REPLAY = "record", "replay"
+# Response headers worth keeping, the body is stored decoded
+_KEPT_HEADERS = ("Content-Type", "Retry-After")
+
+
+class Cassette:
+    """
+    On-disk HTTP cassette of the fetch layer, for deterministic offline runs.
+
+    In `record` mode every final response of _fetch (after retries, 404s included)
+    is stored; in `replay` mode _fetch answers from the cassette only, with no rate
+    limiting, retries or network, and a URL that was never recorded is a FetchError.
+
+    Layout (content-addressed, compressed):
+        <path>/index.jsonl                   {"url", "status", "headers", "body": sha256}, last line of a URL wins
+        <path>/objects/<sha[:2]>/<sha>.gz    gzipped body, stored once however many URLs share it
+
+    Args:
+        path (str): Cassette directory.
+        mode (str): "record" or "replay".
+
+    Usage:
+        cfg.cassette_mode, cfg.cassette_path = "record", "artifacts/cassettes/ml-wfh"
+        with InternshalaScraper(cfg) as scraper: ...   # live run, responses captured
+        cfg.cassette_mode = "replay"                   # same run again, offline, in seconds
+    """
+    def __init__(self, path: str, mode: str = REPLAY):
+        if mode not in (RECORD, REPLAY):
+            raise CustomException(f"Unknown cassette mode '{mode}', expected '{RECORD}' or '{REPLAY}'.")
+        self.path = path
+        self.mode = mode
+        self.index_path = os.path.join(path, "index.jsonl")
+        self.entries: dict[str, dict] = {}
+        self.hits = self.misses = self.recorded = 0
+        self._lock = threading.Lock()
+        self._index = None
+        self._load()
+
+    @classmethod
+    def from_config(cls, cfg: ScraperConfig) -> "Cassette | None":
+        """ The configured cassette, None when `cassette_mode` is off."""
+        if not cfg.cassette_mode:
+            return None
+        return cls(cfg.cassette_path or os.path.join(Constants.cassettes_dir, "default"), cfg.cassette_mode)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            if self.replaying:
+                raise CustomException(f"No cassette to replay at {self.path}")
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self.entries[entry["url"]] = entry
+                except (ValueError, KeyError, TypeError):
+                    continue
+        logger.info("Cassette %s (%s): %s recorded responses", self.path, self.mode, len(self.entries))
+
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.path, "objects", sha[:2], f"{sha}.gz")
+
+    def close(self):
+        with self._lock:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+        if self.hits or self.misses or self.recorded:
+            logger.info("Cassette %s: %s", self.path, self.stats())
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+    def record(self, url: str, response: requests.Response):
+        """ Store the final response of `url`."""
+        body = response.content
+        sha = hashlib.sha256(body).hexdigest()
+        entry = {
+            "url": url,
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers},
+            "body": sha,
+        }
+        object_path = self._object_path(sha)
+        with self._lock:
+            if not os.path.exists(object_path):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                tmp_path = f"{object_path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(gzip.compress(body, compresslevel=6))
+                os.replace(tmp_path, object_path)
+            if self._index is None:
+                os.makedirs(self.path, exist_ok=True)
+                self._index = open(self.index_path, "a", encoding="utf-8", buffering=1)
+            self._index.write(json.dumps(entry) + "\n")
+            self.entries[url] = entry
+            self.recorded += 1
+
+    def replay(self, url: str) -> requests.Response:
+        """ The recorded response of `url`, as a requests.Response."""
+        entry = self.entries.get(url)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            raise FetchError(f"{url} is not in cassette {self.path}", url=url, error_class="CassetteMiss")
+        try:
+            with open(self._object_path(entry["body"]), "rb") as f:
+                body = gzip.decompress(f.read())
+        except (OSError, EOFError) as e:
+            raise FetchError(f"Cassette body of {url} is unreadable: {e}", url=url, error_class="CassetteMiss") from e
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response._content = body
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        with self._lock:
+            self.hits += 1
+        return response
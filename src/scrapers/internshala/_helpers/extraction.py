@@ -0,0 +1,320 @@
+import re
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Iterator
+from src.constants import Constants
+from src.core.exception import CustomException
+from src.core.models import JobDetails
+from src.core.utils import load_json, _extract_posting_date
+from .html_backends import ParserBackend, Node
+
+# Named post-processors a spec may reference, applied in order to the stripped text
+POSTPROCESSORS: dict[str, Callable[[str], str]] = {
+    "posting_date": _extract_posting_date,
+    "lower": str.lower,
+    "collapse_whitespace": lambda text: " ".join(text.split()),
+}
+
+_COMPOUND_RE = re.compile(
+    r'#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+)|:-soup-contains\((?P<q>["\'])(?P<text>.*?)(?P=q)\)'
+)
+_TAG_RE = re.compile(r'[a-zA-Z][\w-]*')
+
+
+@dataclass(frozen=True)
+class Compound:
+    """ One compound selector, e.g. `div.a.b#x:-soup-contains("y")`."""
+    tag: str | None = None
+    node_id: str | None = None
+    classes: tuple[str, ...] = ()
+    contains: tuple[str, ...] = ()
+
+    def matches(self, parser: ParserBackend, node: Node) -> bool:
+        if self.tag is not None and parser.tag(node) != self.tag:
+            return False
+        if self.node_id is not None and parser.node_id(node) != self.node_id:
+            return False
+        if self.classes:
+            node_cls = parser.classes(node)
+            if not all(c in node_cls for c in self.classes):
+                return False
+        if self.contains:
+            text = parser.text(node)
+            if not all(c in text for c in self.contains):
+                return False
+        return True
+
+
+def _parse_compound(token: str, selector: str) -> Compound:
+    tag_match = _TAG_RE.match(token)
+    tag = tag_match.group(0).lower() if tag_match else None
+    pos = tag_match.end() if tag_match else 0
+
+    node_id, classes, contains = None, [], []
+    while pos < len(token):
+        m = _COMPOUND_RE.match(token, pos)
+        if m is None:
+            raise CustomException(f"Unsupported selector syntax '{token[pos:]}' in '{selector}'")
+        if m.group("id"):
+            node_id = m.group("id")
+        elif m.group("cls"):
+            classes.append(m.group("cls"))
+        else:
+            contains.append(m.group("text"))
+        pos = m.end()
+    return Compound(tag, node_id, tuple(classes), tuple(contains))
+
+
+def _tokenize(selector: str) -> list[str]:
+    """ Split a selector into compounds and the ' ' / '+' combinators, quotes respected."""
+    tokens, buf, quote, combinator = [], "", None, None
+    for ch in selector.strip():
+        if quote is None and ch in " +":
+            if buf:
+                tokens.append(buf)
+                buf = ""
+            combinator = "+" if ch == "+" else (combinator or " ")
+            continue
+        if combinator is not None:
+            if not tokens:
+                raise CustomException(f"Invalid selector '{selector}'")
+            tokens.append(combinator)
+            combinator = None
+        if quote is None and ch in "\"'":
+            quote = ch
+        elif ch == quote:
+            quote = None
+        buf += ch
+    if buf:
+        tokens.append(buf)
+    if not tokens or combinator is not None or quote is not None:
+        raise CustomException(f"Invalid selector '{selector}'")
+    return tokens
+
+
+@dataclass(frozen=True)
+class _Chain:
+    """ Compounds joined by combinators, matched right to left against one element."""
+    parts: tuple[Compound, ...]
+    combinators: tuple[str, ...]
+
+    def matches(self, parser: ParserBackend, node: Node) -> bool:
+        return self.parts[-1].matches(parser, node) and self._match_left(parser, node, len(self.parts) - 1)
+
+    def _match_left(self, parser: ParserBackend, node: Node, i: int) -> bool:
+        if i == 0:
+            return True
+        part = self.parts[i - 1]
+        if self.combinators[i - 1] == "+":
+            sibling = parser.prev_element(node)
+            return sibling is not None and part.matches(parser, sibling) and self._match_left(parser, sibling, i - 1)
+
+        ancestor = parser.parent(node)
+        while ancestor is not None:
+            if part.matches(parser, ancestor) and self._match_left(parser, ancestor, i - 1):
+                return True
+            ancestor = parser.parent(ancestor)
+        return False
+
+
+@dataclass(frozen=True)
+class CompiledSelector:
+    """
+    CSS subset used by the field spec: compounds (tag, #id, .class,
+    :-soup-contains("text")) joined by descendant ' ' or adjacent '+' combinators.
+
+    The selector is split at its last descendant combinator into a `scope`
+    (e.g. `.company_and_premium`) and an `inner` part (e.g. `a`). The page walk
+    only tests elements against the scope, matches are then searched for in the
+    scope's subtree, so bare-tag targets never trigger ancestor walks.
+    """
+    source: str
+    scope: _Chain
+    inner: _Chain | None = None
+
+    @classmethod
+    def compile(cls, selector: str) -> "CompiledSelector":
+        tokens = _tokenize(selector)
+        parts = [_parse_compound(tok, selector) for tok in tokens[::2]]
+        combinators = tokens[1::2]
+        if " " not in combinators:
+            return cls(selector, _Chain(tuple(parts), tuple(combinators)))
+
+        split = len(combinators) - combinators[::-1].index(" ")
+        return cls(
+            selector,
+            _Chain(tuple(parts[:split]), tuple(combinators[:split - 1])),
+            _Chain(tuple(parts[split:]), tuple(combinators[split:])),
+        )
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """ Index key of the scope's rightmost compound, ('id'|'class'|'tag'|'any', value)."""
+        last = self.scope.parts[-1]
+        if last.node_id:
+            return ("id", last.node_id)
+        if last.classes:
+            return ("class", last.classes[0])
+        if last.tag:
+            return ("tag", last.tag)
+        return ("any", "")
+
+    def matches(self, parser: ParserBackend, node: Node) -> bool:
+        """ Whether `node` is a scope element of this selector."""
+        return self.scope.matches(parser, node)
+
+    def targets(self, parser: ParserBackend, node: Node) -> Iterator[Node]:
+        """ Elements selected under a matched scope element, in document order."""
+        if self.inner is None:
+            yield node
+            return
+        for elem in parser.iter_elements(node):
+            if self.inner.matches(parser, elem):
+                yield elem
+
+
+@dataclass(frozen=True)
+class FieldRule:
+    """
+    How one JobDetails field is extracted.
+
+    Args:
+        name (str): JobDetails attribute.
+        selectors (tuple): Primary selector followed by fallbacks, first that yields a value wins.
+        many (bool): Collect every match and join them with `join`, else first match only.
+        attr (str, optional): Read this attribute instead of the stripped text.
+        contains (str, optional): Only elements whose text contains it count as a match.
+        max_length (int, optional): Only elements whose stripped text is at most this long count.
+        post (tuple): POSTPROCESSORS functions applied to the text, in order.
+        join (str): Separator for `many` fields.
+    """
+    name: str
+    selectors: tuple[CompiledSelector, ...]
+    many: bool = False
+    attr: str | None = None
+    contains: str | None = None
+    max_length: int | None = None
+    post: tuple[Callable[[str], str], ...] = ()
+    join: str = ", "
+
+    def value(self, parser: ParserBackend, node: Node) -> tuple[bool, Any]:
+        """ Returns (is_match, value) for an element the selector matched."""
+        if self.attr is not None:
+            value = parser.attr(node, self.attr)
+            return True, (str(value) if value is not None else None)
+
+        text = parser.text(node)
+        if self.contains is not None and self.contains not in text:
+            return False, None
+        text = text.strip()
+        if self.max_length is not None and len(text) > self.max_length:
+            return False, None
+        for func in self.post:
+            text = func(text)
+        return True, text
+
+
+def compile_spec(spec: dict[str, dict]) -> list[FieldRule]:
+    """
+    Validate and compile a {field: rule} spec (see src/config/internshala_fields.json).
+    Raises:
+        CustomException: On unknown fields, post-processors or unsupported selectors.
+    """
+    known_fields = {f.name for f in fields(JobDetails)}
+    rules = []
+    for name, rule in spec.items():
+        if name not in known_fields:
+            raise CustomException(f"Extraction spec: '{name}' is not a JobDetails field")
+        try:
+            post = tuple(POSTPROCESSORS[p] for p in rule.get("post", []))
+        except KeyError as e:
+            raise CustomException(f"Extraction spec: unknown post-processor {e} for '{name}'")
+
+        selectors = [rule["selector"], *rule.get("fallbacks", [])]
+        rules.append(FieldRule(
+            name=name,
+            selectors=tuple(CompiledSelector.compile(sel) for sel in selectors),
+            many=bool(rule.get("many", False)),
+            attr=rule.get("attr"),
+            contains=rule.get("contains"),
+            max_length=rule.get("max_length"),
+            post=post,
+            join=rule.get("join", ", "),
+        ))
+    return rules
+
+
+class ExtractionEngine:
+    """
+    Runs a compiled field spec over a parsed page in a single document-order walk.
+
+    Selectors are indexed by the id / first class / tag of their scope element,
+    so each element is only tested against the few selectors that can match it.
+    """
+    def __init__(self, rules: list[FieldRule]):
+        self.rules = rules
+        self._index: dict[tuple[str, str], list[tuple[int, int, CompiledSelector]]] = {}
+        for r, rule in enumerate(rules):
+            for s, selector in enumerate(rule.selectors):
+                self._index.setdefault(selector.key, []).append((r, s, selector))
+        self._any = self._index.get(("any", ""), [])
+        self._by_id = any(kind == "id" for kind, _ in self._index)
+        self._by_tag = any(kind == "tag" for kind, _ in self._index)
+
+    @classmethod
+    def from_file(cls, path: str = Constants.fields_spec_path) -> "ExtractionEngine":
+        return cls(compile_spec(load_json(path)))
+
+    def _candidates(self, parser: ParserBackend, node: Node) -> list[tuple[int, int, CompiledSelector]]:
+        index = self._index
+        found = list(self._any)
+        if self._by_id:
+            node_id = parser.node_id(node)
+            if node_id is not None:
+                found.extend(index.get(("id", node_id), ()))
+        for cls in parser.classes(node):
+            found.extend(index.get(("class", cls), ()))
+        if self._by_tag:
+            found.extend(index.get(("tag", parser.tag(node)), ()))
+        return found
+
+    def extract(self, parser: ParserBackend, root: Node, url: str | None = None) -> JobDetails:
+        """
+        Fill a JobDetails from the page under `root`.
+        Unmatched fields stay None, a fallback is used only when the selectors before it found nothing.
+        """
+        rules = self.rules
+        # per rule, per selector: first value (first-match rules) or list of values (many)
+        matched: list[dict[int, Any]] = [{} for _ in rules]
+
+        for node in parser.iter_elements(root):
+            for r, s, selector in self._candidates(parser, node):
+                rule = rules[r]
+                if not rule.many and s in matched[r]:
+                    continue
+                if not selector.matches(parser, node):
+                    continue
+                for target in selector.targets(parser, node):
+                    is_match, value = rule.value(parser, target)
+                    if not is_match:
+                        continue
+                    if not rule.many:
+                        matched[r][s] = value
+                        break
+                    matched[r].setdefault(s, []).append(value)
+
+        job = JobDetails()
+        job.url = url
+        for rule, values in zip(rules, matched):
+            for s in range(len(rule.selectors)):
+                value = values.get(s)
+                if rule.many and value:
+                    setattr(job, rule.name, rule.join.join(value))
+                    break
+                if not rule.many and value is not None:
+                    setattr(job, rule.name, value)
+                    break
+        return job
+
+
+# Compiled once at import, off the per-page path
+DEFAULT_ENGINE = ExtractionEngine.from_file()
@@ -0,0 +1,267 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Iterator
+from src.core.exception import CustomException
+
+# Node type is backend specific (bs4 Tag, lxml HtmlElement, selectolax LexborNode)
+Node = Any
+
+
+# Markup tokens: comments and script/style bodies (skipped whole, their content is
+# not markup), or a tag with its attributes (quoted values may hold '<' and '>')
+_TOKENS = re.compile(
+    rb'<!--.*?-->'
+    rb'|<(script|style)\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>.*?</\1\s*>'
+    rb'|<(/?)([a-zA-Z][a-zA-Z0-9:-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.DOTALL | re.IGNORECASE
+)
+
+
+def element_end(content: bytes, start: int) -> int | None:
+    """
+    End offset (past its closing tag) of the element whose opening tag starts at
+    `start`, found by counting nested open/close tags of the same name. Comments,
+    script/style bodies and attribute values are skipped. None when unbalanced.
+    """
+    depth, name = 0, None
+    for m in _TOKENS.finditer(content, start):
+        if m.group(3) is None:
+            continue  # comment, script or style
+        tag = m.group(3).lower()
+        if name is None:
+            name = tag
+        if tag != name or (not m.group(2) and m.group(4).rstrip().endswith(b"/")):
+            continue
+        depth += -1 if m.group(2) else 1
+        if depth == 0:
+            return m.end()
+    return None
+
+
+def slice_region(content: bytes, container_id: str) -> bytes | None:
+    """
+    Cut the element with id `container_id` out of a raw HTML document.
+
+    The end of the element is found with element_end(), no tree is built.
+    Returns None when the container is missing or unbalanced, callers then
+    fall back to the full document.
+    """
+    opening = re.search(
+        rb'<[a-zA-Z][a-zA-Z0-9]*\b[^>]*(?<![\w-])id\s*=\s*["\']?' + re.escape(container_id.encode()) + rb'["\'\s>/]',
+        content
+    )
+    if opening is None:
+        return None
+    end = element_end(content, opening.start())
+    return content[opening.start():end] if end is not None else None
+
+
+class ParserBackend(ABC):
+    """
+    Minimal element API the single-pass extractors need from an HTML parser.
+    Only element nodes are exposed, text and comment nodes are skipped.
+    """
+    name: str = ""
+
+    @abstractmethod
+    def parse(self, content: bytes) -> Node:
+        """Parse a document and return its root element."""
+
+    def parse_partial(self, content: bytes, container_id: str) -> Node:
+        """
+        Parse only the subtree of the element with id `container_id`.
+        Falls back to the whole document if the container can't be located.
+        """
+        region = slice_region(content, container_id)
+        return self.parse(region if region is not None else content)
+
+    @abstractmethod
+    def iter_elements(self, root: Node) -> Iterator[Node]:
+        """All elements under `root` (excluded) in document order."""
+
+    @abstractmethod
+    def tag(self, node: Node) -> str:
+        pass
+
+    @abstractmethod
+    def classes(self, node: Node) -> list[str]:
+        pass
+
+    @abstractmethod
+    def node_id(self, node: Node) -> str | None:
+        pass
+
+    @abstractmethod
+    def attr(self, node: Node, name: str) -> str | None:
+        pass
+
+    @abstractmethod
+    def text(self, node: Node) -> str:
+        """Concatenated text of the node and all its descendants."""
+
+    @abstractmethod
+    def prev_element(self, node: Node) -> Node | None:
+        """Closest preceding sibling element, or None."""
+
+    @abstractmethod
+    def parent(self, node: Node) -> Node | None:
+        """Parent element, or None at the top of the tree."""
+
+
+class Bs4Backend(ParserBackend):
+    """ BeautifulSoup with the pure-Python 'html.parser', the original behaviour."""
+    name = "bs4"
+
+    def __init__(self, features: str = "html.parser"):
+        from bs4 import BeautifulSoup, SoupStrainer, Tag
+        self._soup_cls = BeautifulSoup
+        self._strainer_cls = SoupStrainer
+        self._tag_cls = Tag
+        self.features = features
+
+    def parse(self, content):
+        return self._soup_cls(content, self.features)
+
+    def parse_partial(self, content, container_id):
+        # byte slice first, else let a SoupStrainer skip building the rest of the tree
+        region = slice_region(content, container_id)
+        if region is not None:
+            return self.parse(region)
+        return self._soup_cls(content, self.features, parse_only=self._strainer_cls(id=container_id))
+
+    def iter_elements(self, root):
+        tag_cls = self._tag_cls
+        return (node for node in root.descendants if isinstance(node, tag_cls))
+
+    def tag(self, node):
+        return node.name
+
+    def classes(self, node):
+        return node.get("class") or []
+
+    def node_id(self, node):
+        return node.get("id")
+
+    def attr(self, node, name):
+        value = node.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+    def text(self, node):
+        return node.get_text()
+
+    def prev_element(self, node):
+        return node.find_previous_sibling()
+
+    def parent(self, node):
+        return node.parent
+
+
+class LxmlBackend(ParserBackend):
+    """ lxml.html (libxml2), C parser and tree."""
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        self._html = lxml.html
+
+    def parse(self, content):
+        return self._html.document_fromstring(content)
+
+    def iter_elements(self, root):
+        it = root.iter()
+        next(it, None)  # root itself
+        return (node for node in it if isinstance(node.tag, str))
+
+    def tag(self, node):
+        return node.tag
+
+    def classes(self, node):
+        value = node.get("class")
+        return value.split() if value else []
+
+    def node_id(self, node):
+        return node.get("id")
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def text(self, node):
+        return node.text_content()
+
+    def prev_element(self, node):
+        prev = node.getprevious()
+        while prev is not None and not isinstance(prev.tag, str):
+            prev = prev.getprevious()
+        return prev
+
+    def parent(self, node):
+        return node.getparent()
+
+
+class SelectolaxBackend(ParserBackend):
+    """ selectolax on the lexbor engine, fastest C parser with a thin Python API."""
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser_cls = LexborHTMLParser
+
+    def parse(self, content):
+        return self._parser_cls(content).root
+
+    def iter_elements(self, root):
+        it = root.traverse()
+        next(it, None)  # root itself
+        return (node for node in it if node.tag[0] != "-")
+
+    def tag(self, node):
+        return node.tag
+
+    def classes(self, node):
+        value = node.attributes.get("class")
+        return value.split() if value else []
+
+    def node_id(self, node):
+        return node.attributes.get("id")
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+    def text(self, node):
+        return node.text(deep=True)
+
+    def prev_element(self, node):
+        prev = node.prev
+        while prev is not None and prev.tag[0] == "-":
+            prev = prev.prev
+        return prev
+
+    def parent(self, node):
+        return node.parent
+
+
+BACKENDS: dict[str, type[ParserBackend]] = {
+    Bs4Backend.name: Bs4Backend,
+    LxmlBackend.name: LxmlBackend,
+    SelectolaxBackend.name: SelectolaxBackend,
+}
+
+_instances: dict[str, ParserBackend] = {}
+
+
+def get_backend(name: str = "bs4") -> ParserBackend:
+    """
+    Return the (cached) parser backend registered under `name`.
+    Raises:
+        CustomException: If the name is unknown or its library is not installed.
+    """
+    backend = _instances.get(name)
+    if backend is not None:
+        return backend
+    if name not in BACKENDS:
+        raise CustomException(f"Unknown parser backend '{name}', choose from {sorted(BACKENDS)}")
+    try:
+        backend = _instances[name] = BACKENDS[name]()
+    except ImportError as e:
+        raise CustomException(f"Parser backend '{name}' is not installed: {e}") from e
+    return backend
@@ -0,0 +1,47 @@
+import requests
+from requests.adapters import HTTPAdapter
+from src.core.config import ScraperConfig
+
+
+def _accept_encoding() -> str:
+    """
+    Advertise brotli only when urllib3 can decode it (brotli/brotlicffi installed).
+    """
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        pass
+    try:
+        import brotlicffi  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+
+def build_session(cfg: ScraperConfig) -> requests.Session:
+    """
+    Build a pooled, keep-alive HTTP session shared by all scraper requests.
+
+    Args:
+        cfg (ScraperConfig): Supplies headers and `pool_size`, the number of
+            connections kept open per host (never below `per_host_concurrency`).
+
+    Returns:
+        requests.Session: Session with compressed transfers enabled.
+            Timeouts are still passed per request, requests.Session has no default.
+    """
+    pool_size = max(int(cfg.pool_size), int(cfg.per_host_concurrency))
+    adapter = HTTPAdapter(
+        pool_connections=len(cfg.base_urls) or 1,
+        pool_maxsize=pool_size,
+        pool_block=True,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(cfg.headers)
+    session.headers["Accept-Encoding"] = _accept_encoding()
+    session.headers["Connection"] = "keep-alive"
+    return session
@@ -0,0 +1,143 @@
+import time
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from src.core.config import ScraperConfig
+from src.core.logger import scraper_logger as logger
+
+# Status codes the server uses to say "slow down"
+THROTTLE_STATUS = (429, 503)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header, either delta-seconds or an HTTP-date.
+    Returns the delay in seconds, or None if missing/unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe token bucket whose refill rate adapts AIMD-style.
+
+    - Additive increase: every healthy response (no throttle status, latency
+      under `latency_target`) raises the rate by `increase_step`, plus a time-based
+      share of the range so a collapsed rate climbs from `min_rate` back to
+      `max_rate` within about `recovery_seconds`, however few requests it sends.
+    - Multiplicative decrease: a 429/503 multiplies the rate by `decrease_factor`,
+      down to `min_rate`, at most once per `decrease_cooldown` seconds (a burst of
+      429s answers requests sent at the same rate, it is one congestion signal),
+      and a Retry-After header blocks the bucket until it expires.
+
+    Args:
+        rate (float): Initial requests per second.
+        burst (int): Bucket capacity, max requests sent back to back.
+        min_rate (float): Lower bound for the adapted rate.
+        max_rate (float): Upper bound for the adapted rate.
+        latency_target (float): Response time (s) considered healthy.
+        increase_step (float): Requests per second added per healthy response.
+        decrease_factor (float): Rate multiplier applied on throttling.
+        decrease_cooldown (float): Seconds after a decrease during which throttling doesn't lower the rate again.
+        recovery_seconds (float): Time for healthy traffic to raise the rate from `min_rate` to `max_rate`.
+    """
+    def __init__(self,
+                 rate: float = 1.0,
+                 burst: int = 2,
+                 min_rate: float = 0.1,
+                 max_rate: float = 4.0,
+                 latency_target: float = 2.0,
+                 increase_step: float = 0.05,
+                 decrease_factor: float = 0.5,
+                 decrease_cooldown: float = 2.0,
+                 recovery_seconds: float = 30.0):
+        self.min_rate = float(min_rate)
+        self.max_rate = max(float(max_rate), self.min_rate)
+        self.rate = min(max(float(rate), self.min_rate), self.max_rate)
+        self.burst = max(1, int(burst))
+        self.latency_target = float(latency_target)
+        self.increase_step = float(increase_step)
+        self.decrease_factor = float(decrease_factor)
+        self.decrease_cooldown = max(0.0, float(decrease_cooldown))
+        # requests per second gained per second of healthy traffic
+        self.recovery_rate = (self.max_rate - self.min_rate) / recovery_seconds if recovery_seconds > 0 else 0.0
+
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._last_increase = self._last
+        self._decreased_at = float("-inf")
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cfg: ScraperConfig) -> "AdaptiveRateLimiter":
+        return cls(
+            rate=cfg.rate_limit_rps,
+            burst=cfg.rate_limit_burst,
+            min_rate=cfg.rate_limit_min_rps,
+            max_rate=cfg.rate_limit_max_rps,
+            latency_target=cfg.latency_target,
+            decrease_cooldown=cfg.rate_limit_decrease_cooldown,
+            recovery_seconds=cfg.rate_limit_recovery_seconds,
+        )
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent.
+        Returns: seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def feedback(self, status: int, latency: float, retry_after: str | None = None):
+        """
+        Adapt the rate from the outcome of a request.
+        Args:
+            status (int): HTTP status code of the response.
+            latency (float): Response time in seconds.
+            retry_after (str, optional): Raw Retry-After header value.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if status in THROTTLE_STATUS:
+                self._tokens = min(self._tokens, 0.0)
+                delay = parse_retry_after(retry_after)
+                if delay:
+                    self._blocked_until = max(self._blocked_until, now + delay)
+                if now - self._decreased_at >= self.decrease_cooldown:
+                    self._decreased_at = now
+                    self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                    logger.warning("Throttled with %s, rate lowered to %.2f req/s", status, self.rate)
+
+            elif status < 400 and latency <= self.latency_target:
+                # healthy time since the last response, at most one request interval (not idle or blocked time)
+                healthy = min(now - self._last_increase, max(1.0, 1 / self.rate))
+                self.rate = min(self.max_rate, self.rate + self.increase_step + healthy * self.recovery_rate)
+            self._last_increase = now
@@ -0,0 +1,189 @@
+import time
+import random
+import threading
+from dataclasses import dataclass, field
+import requests
+from src.core.config import ScraperConfig
+from src.core.exception import CustomException
+from src.core.logger import scraper_logger as logger
+
+# Statuses worth another attempt: timeouts, throttling and transient server errors
+RETRYABLE_STATUS = (408, 425, 429, 500, 502, 503, 504)
+# Network errors worth another attempt, anything else (bad URL, TLS, ...) is fatal
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class FetchError(CustomException):
+    """
+    A fetch that failed for good.
+
+    Attributes:
+        url (str): Requested URL.
+        status (int | None): Last HTTP status, None for network errors.
+        attempts (int): Attempts made.
+        retryable (bool): Whether the last error was transient (retries exhausted) or fatal.
+        error_class (str): Class name of the underlying error.
+    """
+    def __init__(self, message, url: str, status: int | None = None, attempts: int = 1,
+                 retryable: bool = False, error_class: str | None = None):
+        super().__init__(message)
+        self.url = url
+        self.status = status
+        self.attempts = attempts
+        self.retryable = retryable
+        self.error_class = error_class or ("HTTPError" if status is not None else type(self).__name__)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: attempt n waits a random time in
+    [0, min(max_delay, base_delay * 2**(n-1))], but never less than the server's Retry-After.
+
+    Args:
+        max_attempts (int): Attempts per request, 1 disables retries.
+        base_delay (float): Backoff of the first retry (seconds).
+        max_delay (float): Cap of a single backoff (seconds).
+    """
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    @classmethod
+    def from_config(cls, cfg: ScraperConfig) -> "RetryPolicy":
+        return cls(
+            max_attempts=cfg.retry_max_attempts,
+            base_delay=cfg.retry_base_delay,
+            max_delay=cfg.retry_max_delay,
+        )
+
+    @staticmethod
+    def retryable(error: Exception | None = None, status: int | None = None) -> bool:
+        if error is not None:
+            return isinstance(error, RETRYABLE_ERRORS)
+        return status in RETRYABLE_STATUS
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        return max(backoff, retry_after or 0.0)
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker, thread-safe.
+
+    After `failure_threshold` consecutive failures the host's circuit opens and
+    every request to it waits (the crawl pauses) for `reset_timeout` seconds.
+    Then a single probe request is let through (half-open): success closes the
+    circuit, failure opens it again. A probe that ends with neither (interrupted,
+    unexpected exception) must give its slot back with release(), and a probe
+    outstanding for longer than `reset_timeout` is taken over by the next caller,
+    so no caller waits on a lost probe forever.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Pause before probing an open circuit (seconds).
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self._failures: dict[str, int] = {}
+        self._opened_at: dict[str, float] = {}
+        # host -> (thread ident, start) of the probe in flight
+        self._probing: dict[str, tuple[int, float]] = {}
+        self._cond = threading.Condition()
+        self.trips = 0
+
+    @classmethod
+    def from_config(cls, cfg: ScraperConfig) -> "CircuitBreaker":
+        return cls(failure_threshold=cfg.breaker_failure_threshold, reset_timeout=cfg.breaker_reset_timeout)
+
+    def state(self, host: str) -> str:
+        with self._cond:
+            if host not in self._opened_at:
+                return "closed"
+            return "half-open" if host in self._probing else "open"
+
+    def acquire(self, host: str) -> float:
+        """
+        Block while the host's circuit is open.
+        Returns: seconds spent waiting.
+        """
+        waited = 0.0
+        with self._cond:
+            while True:
+                opened_at = self._opened_at.get(host)
+                if opened_at is None:
+                    return waited
+                now = time.monotonic()
+                remaining = opened_at + self.reset_timeout - now
+                probe = self._probing.get(host)
+                if probe is not None and now - probe[1] >= self.reset_timeout:
+                    logger.warning("Probe of %s outstanding for %.0fs, sending another one", host, now - probe[1])
+                    probe = None
+                if remaining <= 0 and probe is None:
+                    self._probing[host] = (threading.get_ident(), now)
+                    logger.info("Circuit half-open for %s, sending a probe request", host)
+                    return waited
+                # wait for the reset timeout, or for the probe's outcome (bounded, the probe may be lost)
+                timeout = remaining if remaining > 0 else probe[1] + self.reset_timeout - now
+                self._cond.wait(timeout=max(timeout, 0.01))
+                waited += time.monotonic() - now
+
+    def release(self, host: str):
+        """
+        Give back the probe slot taken by this thread's acquire() if neither
+        record_success() nor record_failure() followed, the circuit stays open and
+        the next caller probes. No-op otherwise.
+        """
+        with self._cond:
+            probe = self._probing.get(host)
+            if probe is not None and probe[0] == threading.get_ident():
+                del self._probing[host]
+                self._cond.notify_all()
+
+    def record_success(self, host: str):
+        with self._cond:
+            self._failures[host] = 0
+            if host in self._opened_at:
+                logger.info("Circuit closed for %s", host)
+            self._opened_at.pop(host, None)
+            self._probing.pop(host, None)
+            self._cond.notify_all()
+
+    def record_failure(self, host: str):
+        with self._cond:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            failed_probe = host in self._probing
+            if failed_probe or (host not in self._opened_at and self._failures[host] >= self.failure_threshold):
+                self.trips += 1
+                self._opened_at[host] = time.monotonic()
+                self._probing.pop(host, None)
+                logger.warning("Circuit open for %s after %s failures, pausing %.0fs", host, self._failures[host], self.reset_timeout)
+                self._cond.notify_all()
+
+
+@dataclass
+class FetchStats:
+    """ Thread-safe fetch counters: requests, retries, failures and time spent backing off."""
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    retry_wait: float = 0.0
+    breaker_wait: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "retry_wait_s": round(self.retry_wait, 2),
+                "breaker_wait_s": round(self.breaker_wait, 2),
+            }
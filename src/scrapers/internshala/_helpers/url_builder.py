@@ -23,6 +23,16 @@ def compile_url(cfg:ScraperConfig) -> list[str]:
         logger.error("No links compiled, Check The config file for issue.") 
     return url_list
 
+def page_url(source_url:str, page:int) -> str:
+    """
+    Return the URL of a given search results page.
+    Internshala serves page N (N > 1) under `<search url>/page-N/`.
+    """
+    if page <= 1:
+        return source_url
+    return source_url.rstrip('/') + f"/page-{page}/"
+
+
 def _build_internship_url(cfg:ScraperConfig):
     """
     Construct a search URL for internships based on configuration parameters.
@@ -75,7 +85,7 @@ def _build_internship_url(cfg:ScraperConfig):
     
     url = "".join(segments) + "/"
     final_url = url.replace(' ', '-').lower()
-    logger.info(f"Finished compling base URL, {final_url}")
+    logger.info("Finished compling base URL, %s", final_url)
     return final_url
 
 
@@ -139,5 +149,5 @@ def _build_job_url(cfg:ScraperConfig):
     
     url = "".join(segments) + "/"
     final_url = url.replace(' ', '-').lower()
-    logger.info(f"Finished compling base URL, {final_url}")
+    logger.info("Finished compling base URL, %s", final_url)
     return final_url
\ No newline at end of file
@@ -1,89 +1,420 @@
 import sys
+import asyncio
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterable, Iterator, Mapping
 from src.core.config import ScraperConfig
 from src.core.exception import CustomException
 from src.core.logger import scraper_logger as logger
 from src.core.models import JobDetails
+from src.core.journal import ScrapeJournal
+from src.core.profiling import profiled
 from src.core.utils import save_to_csv
-from ._helpers.bf4_client import _scrape_job_details, _get_jobDetails_url
-from ._helpers.url_builder import compile_url
+from ._helpers.bf4_client import _scrape_job_details, _get_jobDetails_url, Unchanged, Removed
+from ._helpers.url_builder import compile_url, page_url
+from ._helpers.async_engine import AsyncFetchEngine
+from ._helpers.rate_limiter import AdaptiveRateLimiter
+from ._helpers.retry import RetryPolicy, CircuitBreaker, FetchStats
+from ._helpers.cassette import Cassette
+from ._helpers.http_session import build_session
+from ._helpers.html_backends import get_backend
+
+# Incremental paging hook: given job URLs, return the ones already in the store
+KnownUrls = Callable[[list[str]], Iterable[str]]
+# Re-scrape hook: called for pages whose fingerprint matches the stored one
+OnUnchanged = Callable[[Unchanged], None]
+# Re-scrape hook: called for pages that answered 404
+OnRemoved = Callable[[Removed], None]
+# Failure isolation hook: receives (url, error) and the scrape goes on, e.g. DeadLetterStore.record
+OnError = Callable[[str, CustomException], None]
 
 class InternshalaScraper:
-    def __init__ (self, config:ScraperConfig, max_page = 1):
+    def __init__ (self, config:ScraperConfig, max_page:int | None = None):
         """
         A scraper for extracting job and internship listings from Internshala.
         Args:
             config (ScraperConfig): Configuration object containing search parameters and HTTP settings
-            max_page (int, optional): Maximum number of search result pages to scrape. Defaults to 1.
+            max_page (int, optional): Maximum number of search result pages to scrape. Defaults to `config.max_page`.
         """
         self.cfg = config
+        self.max_page: int = max(1, max_page if max_page is not None else config.max_page)
         self.base_url: str = config.base_urls["internshala"]
         self.header: dict = config.headers
+        self.timeout: float = config.timeout
+        self.limiter = AdaptiveRateLimiter.from_config(config)
+        self.retry = RetryPolicy.from_config(config)
+        self.breaker = CircuitBreaker.from_config(config)
+        self.stats = FetchStats()
+        self.cassette = Cassette.from_config(config)
+        self.session = build_session(config)
+        self.parser = get_backend(config.parser_backend)
         self.results: list[JobDetails] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Release pooled HTTP connections."""
+        self.session.close()
+        if self.cassette is not None:
+            self.cassette.close()
+        logger.info("Fetch stats: %s", self.fetch_stats())
+
+    def fetch_stats(self) -> dict:
+        """ Requests, retries, failures, backoff / circuit-breaker wait seconds, breaker trips and cassette hits so far."""
+        stats = {**self.stats.snapshot(), "breaker_trips": self.breaker.trips}
+        if self.cassette is not None:
+            stats["cassette"] = self.cassette.stats()
+        return stats
     
                 
-    def scrape(self, job_links:list[str] , limit:int = -1) -> list[JobDetails]:
+    def _scrape_one(self, url:str, known_fingerprint:str | None = None) -> JobDetails | Unchanged | Removed:
+        """ Fetch and parse one job details page with the scraper's shared resources."""
+        return _scrape_job_details(
+            header= self.header,
+            url= url,
+            timeout= self.timeout,
+            limiter= self.limiter,
+            session= self.session,
+            parser= self.parser,
+            container_id= self.cfg.detail_container_id,
+            known_fingerprint= known_fingerprint,
+            retry= self.retry,
+            breaker= self.breaker,
+            stats= self.stats,
+            cassette= self.cassette
+        )
+
+    @staticmethod
+    def _collect(url:str,
+                 result:JobDetails | Unchanged | Removed | None,
+                 on_unchanged:OnUnchanged | None,
+                 on_removed:OnRemoved | None = None) -> JobDetails | None:
+        """ Route an unchanged page to `on_unchanged`, a 404 to `on_removed`, pass parsed jobs through."""
+        if isinstance(result, Unchanged):
+            if on_unchanged is not None:
+                on_unchanged(result)
+            return None
+        if isinstance(result, Removed):
+            if on_removed is not None:
+                on_removed(result)
+            return None
+        if result is not None:
+            logger.info("finnished compiling details for \n%s", url)
+        return result
+
+    def iter_scrape(self,
+                    job_links:Iterable[str],
+                    limit:int = -1,
+                    fingerprints:Mapping[str, str] | None = None,
+                    on_unchanged:OnUnchanged | None = None,
+                    journal:ScrapeJournal | None = None,
+                    on_error:OnError | None = None,
+                    on_removed:OnRemoved | None = None) -> Iterator[JobDetails]:
+        """
+        Scrape job details lazily, yielding each JobDetails as soon as it is parsed.
+        Nothing is kept on the instance, so memory stays flat however many URLs
+        are fed in (`job_links` may itself be a generator).
+        Args:
+            job_links (Iterable[str]): Job details URLs.
+            limit (int, optional): Maximum number of URLs to scrape, negative scrapes all.
+            fingerprints (Mapping, optional): url -> stored fingerprint, for re-scrapes.
+                Pages that still match are not parsed nor yielded but passed to `on_unchanged`.
+            on_unchanged (Callable, optional): Receives an Unchanged for every such page.
+            journal (ScrapeJournal, optional): Skip URLs it has as done, record each URL
+                as done (with its job) once yielded, or as failed.
+            on_error (Callable, optional): Per-URL failure isolation, a failing URL is passed
+                to it with its error and the iteration continues. Without it the error is raised.
+            on_removed (Callable, optional): Receives a Removed for every page that answered 404.
+
+        Note:
+            KeyboardInterrupt ends the iteration gracefully.
+        """
+        try:
+            fingerprints = fingerprints or {}
+            if journal is not None:
+                job_links = journal.remaining(job_links)
+            for url in islice(job_links, limit if limit > 0 else None):
+                try:
+                    job = self._collect(url, self._scrape_one(url, fingerprints.get(url)), on_unchanged, on_removed)
+                except CustomException as e:
+                    if journal is not None:
+                        journal.mark_failed(url, str(e))
+                    if on_error is None:
+                        raise
+                    on_error(url, e)
+                    continue
+                if job is not None:
+                    yield job
+                if journal is not None:
+                    journal.mark_done(url, job)
+        except KeyboardInterrupt:
+            logger.critical("User terminated process with KeyboardInterrupt")
+
+    @profiled
+    def scrape(self,
+               job_links:list[str],
+               limit:int = -1,
+               fingerprints:Mapping[str, str] | None = None,
+               on_unchanged:OnUnchanged | None = None,
+               journal:ScrapeJournal | None = None,
+               on_error:OnError | None = None,
+               on_removed:OnRemoved | None = None) -> list[JobDetails]:
         """
         Execute the scraping process to collect job listings.
         Args:
         limit (int, optional): Maximum number of job listings to scrape. 
             If negative or not provided, all available listings will be scraped. Defaults to -1.
+        fingerprints, on_unchanged: Skip unchanged re-scraped pages, see iter_scrape().
+        journal (ScrapeJournal, optional): Resume a run, URLs done by earlier attempts
+            are not fetched again and their jobs are returned from the journal.
+        on_error (Callable, optional): Isolate failing URLs instead of stopping, see iter_scrape().
+        on_removed (Callable, optional): Receives the pages that answered 404, see iter_scrape().
     
         Returns:
-            List[JobDetails]: Collection of job details objects containing all extracted information
+            List[JobDetails]: Collection of job details objects containing all extracted information,
+                             also kept in `self.results` until the next call
                              
         Note:
             The method catches KeyboardInterrupt to allow for graceful
             termination of scraping by the user
         """
+        results = []
         try:
+            if journal is not None:
+                job_links = job_links[:limit if limit > 0 else None]
+                journal.mark_pending(job_links)
+                wanted = set(job_links)
+                results = [job for job in journal.done_jobs() if job.url in wanted]
+                limit = -1
+
             # scrape Job Details
-            for url in job_links[:limit if limit > 0 else None]:
-                job = _scrape_job_details(
-                    header= self.header,
-                    url= url
-                )
-                if job is not None:
-                    self.results.append(job)
-                    logger.info(f"finnished compiling details for \n{url}")
-    
-        except KeyboardInterrupt:
-            logger.critical("User terminated process with KeyboardInterrupt")
+            for job in self.iter_scrape(job_links, limit, fingerprints, on_unchanged, journal, on_error, on_removed):
+                results.append(job)
         finally:
+            self.results = results
             return self.results
-        
-    def build_urls(self) -> list[str]:
+
+    def _get_page_links(self, url:str) -> list[str]:
+        """ Fetch one search results page and return its job URLs."""
+        return _get_jobDetails_url(
+            header = self.header,
+            source_url = url,
+            base_url = self.base_url,
+            timeout = self.timeout,
+            limiter = self.limiter,
+            session = self.session,
+            parser = self.parser,
+            retry = self.retry,
+            breaker = self.breaker,
+            stats = self.stats,
+            cassette = self.cassette
+        )
+
+    def _is_last_page(self, page_url:str, urls:list[str], known_urls:KnownUrls | None) -> bool:
+        """
+        A page ends the crawl of its search when it is empty (past the last page),
+        or, in incremental mode, when every URL on it is already known to the store.
+        """
+        if not urls:
+            return True
+        if known_urls is not None and len(set(known_urls(urls))) >= len(set(urls)):
+            logger.info("All job urls already known, stop paging at \n%s", page_url)
+            return True
+        return False
+
+    @profiled
+    def build_urls(self, known_urls:KnownUrls | None = None) -> list[str]:
         """
         This method
         1. Build search URLs based on configuration
-        2. Extract job listing URLs from search results
+        2. Extract job listing URLs from search results, page 1 to `max_page`
+        Args:
+            known_urls (Callable, optional): Incremental mode, returns the subset of
+                the given URLs already in the store. Paging stops at the first page
+                holding only known URLs.
         """
+        links = []
         try:
             # compiling URL as per Config
             source_urls = compile_url(cfg=self.cfg)
             logger.info("Finished compiling source URL as per Config")
 
-            links = []
-            # get job details url
-            for url in source_urls:
-                urls = _get_jobDetails_url(
-                    header = self.header,
-                    source_url = url,
-                    base_url = self.base_url
-                )
-                links.extend(urls)
-            logger.info(f"Successfuly collected {len(links)} job urls from the source")
+            # get job details url, page by page
+            for source_url in filter(None, source_urls):
+                for page in range(1, self.max_page + 1):
+                    url = page_url(source_url, page)
+                    urls = self._get_page_links(url)
+                    if self._is_last_page(url, urls, known_urls):
+                        break
+                    links.extend(urls)
+            links = list(dict.fromkeys(links))
+            logger.info("Successfuly collected %s job urls from the source", len(links))
 
         except KeyboardInterrupt:
             logger.critical("User terminated process with KeyboardInterrupt")
         finally:
             return links
 
+    async def _run_isolated(self,
+                            engine:AsyncFetchEngine,
+                            url:str,
+                            known_fingerprint:str | None,
+                            on_error:OnError | None) -> JobDetails | Unchanged | Removed | None:
+        """ _scrape_one on the engine, failures go to `on_error` (if any) instead of raising."""
+        try:
+            return await engine.run(url, self._scrape_one, url, known_fingerprint)
+        except CustomException as e:
+            if on_error is None:
+                raise
+            on_error(url, e)
+            return None
+
+    def iter_replay(self, dead_letters, limit:int = -1, exclude_run_id:str | None = None) -> Iterator[JobDetails]:
+        """
+        Re-feed dead letters through the scraper in bulk, yielding the jobs that now succeed.
+        A URL is resolved in the store once it has been handled (yielded, 404 or unchanged),
+        failing again records it again with a higher count.
+        Args:
+            dead_letters (DeadLetterStore | MongoDeadLetterStore): Store to replay.
+            limit (int, optional): Maximum number of dead letters to replay, negative replays all.
+            exclude_run_id (str, optional): Leave the failures of this run (e.g. the current one) for later.
+        """
+        entries = dead_letters.entries(limit if limit > 0 else 0, exclude_run_id=exclude_run_id)
+        logger.info("Replaying %s dead letters", len(entries))
+        for entry in entries:
+            url = entry["url"]
+            try:
+                job = self._collect(url, self._scrape_one(url), None)
+            except CustomException as e:
+                dead_letters.record(url, e)
+                continue
+            if job is not None:
+                yield job
+            dead_letters.resolve([url])
+
+    async def aiter_scrape(self,
+                           job_links:Iterable[str],
+                           limit:int = -1,
+                           fingerprints:Mapping[str, str] | None = None,
+                           on_unchanged:OnUnchanged | None = None,
+                           on_error:OnError | None = None,
+                           on_removed:OnRemoved | None = None) -> AsyncIterator[JobDetails]:
+        """
+        Async-iterator twin of iter_scrape(): keeps `cfg.max_concurrency` detail pages
+        in flight and yields each JobDetails as soon as its page is parsed.
+        Only the in-flight window is held in memory; results come in completion order.
+        """
+        links = islice(job_links, limit if limit > 0 else None)
+        fingerprints = fingerprints or {}
+        async with AsyncFetchEngine(
+            max_concurrency= self.cfg.max_concurrency,
+            per_host_concurrency= self.cfg.per_host_concurrency
+        ) as engine:
+            in_flight: dict[asyncio.Future, str] = {}
+
+            def submit() -> bool:
+                url = next(links, None)
+                if url is None:
+                    return False
+                in_flight[asyncio.ensure_future(self._run_isolated(engine, url, fingerprints.get(url), on_error))] = url
+                return True
+
+            try:
+                while len(in_flight) < engine.max_concurrency and submit():
+                    pass
+                while in_flight:
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        url = in_flight.pop(task)
+                        job = self._collect(url, task.result(), on_unchanged, on_removed)
+                        submit()
+                        if job is not None:
+                            yield job
+            finally:
+                for task in in_flight:
+                    task.cancel()
+
+    @profiled
+    async def scrape_async(self,
+                           job_links:list[str],
+                           limit:int = -1,
+                           fingerprints:Mapping[str, str] | None = None,
+                           on_unchanged:OnUnchanged | None = None,
+                           on_error:OnError | None = None,
+                           on_removed:OnRemoved | None = None) -> list[JobDetails]:
+        """
+        Concurrent twin of scrape(), keeps up to `cfg.max_concurrency` detail
+        pages in flight (`cfg.per_host_concurrency` per host).
+        Args:
+        limit (int, optional): Maximum number of job listings to scrape, negative scrapes all.
+        fingerprints, on_unchanged: Skip unchanged re-scraped pages, see iter_scrape().
+        on_error (Callable, optional): Isolate failing URLs instead of stopping, see iter_scrape().
+        on_removed (Callable, optional): Receives the pages that answered 404, see iter_scrape().
+
+        Returns:
+            List[JobDetails]: Job details in the same order as `job_links`
+        """
+        links = job_links[:limit if limit > 0 else None]
+        fingerprints = fingerprints or {}
+        async with AsyncFetchEngine(
+            max_concurrency= self.cfg.max_concurrency,
+            per_host_concurrency= self.cfg.per_host_concurrency
+        ) as engine:
+            jobs = await engine.map(links, lambda url: self._run_isolated(engine, url, fingerprints.get(url), on_error))
+
+        self.results = []
+        for url, result in zip(links, jobs):
+            job = self._collect(url, result, on_unchanged, on_removed)
+            if job is not None:
+                self.results.append(job)
+        return self.results
+
+    @profiled
+    async def build_urls_async(self, known_urls:KnownUrls | None = None) -> list[str]:
+        """
+        Concurrent twin of build_urls(), all searches are paged concurrently.
+        Without `known_urls` pages 1 to `max_page` are fetched at once; in incremental
+        mode pages are fetched in growing waves (1, 2, 4, ... up to `per_host_concurrency`)
+        so a run with nothing new costs a single page fetch per search.
+        """
+        source_urls = [url for url in compile_url(cfg=self.cfg) if url]
+        logger.info("Finished compiling source URL as per Config")
+
+        async with AsyncFetchEngine(
+            max_concurrency= self.cfg.max_concurrency,
+            per_host_concurrency= self.cfg.per_host_concurrency
+        ) as engine:
+
+            async def crawl(source_url:str) -> list[str]:
+                found = []
+                page = 1
+                wave = 1 if known_urls is not None else self.max_page
+                while page <= self.max_page:
+                    urls = [page_url(source_url, p) for p in range(page, min(page + wave, self.max_page + 1))]
+                    pages = await engine.map(urls, lambda url: engine.run(url, self._get_page_links, url))
+                    for url, page_links in zip(urls, pages):
+                        if self._is_last_page(url, page_links, known_urls):
+                            return found
+                        found.extend(page_links)
+                    page += len(urls)
+                    wave = min(wave * 2, self.cfg.per_host_concurrency)
+                return found
+
+            results = await engine.map(source_urls, crawl)
+
+        links = list(dict.fromkeys(link for found in results for link in found))
+        logger.info("Successfuly collected %s job urls from the source", len(links))
+        return links
+
 
 if __name__ == "__main__":
     config = ScraperConfig().load_default_cfg()
-    scraper = InternshalaScraper(config=config)
-    links = scraper.build_urls()
-    res = scraper.scrape(links)
+    with InternshalaScraper(config=config) as scraper:
+        links = asyncio.run(scraper.build_urls_async())
+        res = asyncio.run(scraper.scrape_async(links))
     if len(res) > 1:
         logger.info("Successfully compleated Job details scraping")
         logger.debug("Saving records to CSV")